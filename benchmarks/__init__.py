@@ -0,0 +1,6 @@
+"""
+Benchmarks of the overhead of EventActionModel compared to a plain models.Model.
+
+Run them from the root of the repository with ``python -m benchmarks``, the models are created
+in an in-memory SQLite database next to the models of the ``tests`` app.
+"""
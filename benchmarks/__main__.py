@@ -0,0 +1,84 @@
+"""
+Run the benchmarks and print the overhead of EventActionModel compared to models.Model.
+
+    python -m benchmarks [--only save diff] [--json results.json] [--compare results.json]
+
+With --compare the overhead ratios (or the absolute values of the benchmarks without a baseline)
+are compared to a previous run and the exit status is 1 if any of them regressed more than
+--max-regression.
+"""
+import argparse
+import json
+import os
+import sys
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('--only', nargs='+', metavar='BENCHMARK', help='The benchmarks to run.')
+    parser.add_argument('--json', metavar='PATH', help='Write the results to a JSON file.')
+    parser.add_argument('--compare', metavar='PATH', help='Compare the results to a JSON file of a previous run.')
+    parser.add_argument('--max-regression', type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'model_events.settings')
+    import django
+    django.setup()
+
+    from django.db import connection
+    from .cases import BENCHMARKS
+
+    names = args.only or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f'unknown benchmarks {sorted(unknown)}, choose from {list(BENCHMARKS)}')
+
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        results = [result for name in names for result in BENCHMARKS[name]()]
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    _print_results(results)
+    data = {f'{result.name} / {result.variant}': _to_json(result) for result in results}
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(data, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = _get_regressions(json.load(file), data, args.max_regression)
+        for key, old, new in regressions:
+            print(f'REGRESSION {key}: {old:.2f} -> {new:.2f}')
+        return 1 if regressions else 0
+    return 0
+
+
+def _to_json(result):
+    ratio = result.value / result.baseline if result.baseline else None
+    return {'baseline': result.baseline, 'value': result.value, 'ratio': ratio, 'unit': result.unit}
+
+
+def _print_results(results):
+    print(f'{"benchmark":<22}{"variant":<16}{"plain":>12}{"event":>12}{"ratio":>8}  unit')
+    for result in results:
+        baseline = f'{result.baseline:.2f}' if result.baseline is not None else '-'
+        ratio = f'{result.value / result.baseline:.2f}x' if result.baseline else '-'
+        print(f'{result.name:<22}{result.variant:<16}{baseline:>12}{result.value:>12.2f}{ratio:>8}  {result.unit}')
+
+
+def _get_regressions(old_data, new_data, max_regression):
+    regressions = []
+    for key, new in new_data.items():
+        old = old_data.get(key)
+        if old is None:
+            continue
+        metric = 'ratio' if new['ratio'] is not None and old['ratio'] is not None else 'value'
+        if old[metric] and new[metric] / old[metric] > max_regression:
+            regressions.append((key, old[metric], new[metric]))
+    return regressions
+
+
+if __name__ == '__main__':
+    sys.exit(main())
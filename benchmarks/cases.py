@@ -0,0 +1,142 @@
+"""The benchmarks, each of them returns a list of Results"""
+import gc
+import timeit
+import tracemalloc
+from collections import namedtuple
+
+from django.db import models
+
+from event_actions.models import EventActionModel
+
+from .models import make_fk_models, make_model, make_model_pair
+
+# 'baseline' is the measurement of the plain model, None if there isn't a comparable one
+Result = namedtuple('Result', ['name', 'variant', 'baseline', 'value', 'unit'])
+
+ROW_COUNT = 1000
+
+
+def measure(func, number, repeat=5):
+    """
+    Return the best time of a call of the function in microseconds.
+    """
+    return min(timeit.Timer(func).repeat(repeat, number)) / number * 1e6
+
+
+def bench_instantiation(field_count=10):
+    plain_model, event_model = make_model_pair('Row', field_count)
+    values = {f'field_{i}': i for i in range(field_count)}
+
+    results = [Result(
+        'instantiate', f'{field_count} fields',
+        measure(lambda: plain_model(**values), ROW_COUNT),
+        measure(lambda: event_model(**values), ROW_COUNT),
+        'us/row',
+    )]
+
+    for model in (plain_model, event_model):
+        model.objects.bulk_create([model(**values) for _ in range(ROW_COUNT)])
+    results.append(Result(
+        'load', f'{field_count} fields',
+        measure(lambda: list(plain_model.objects.all()), 1) / ROW_COUNT,
+        measure(lambda: list(event_model.objects.all()), 1) / ROW_COUNT,
+        'us/row',
+    ))
+    return results
+
+
+def bench_save(handler_counts=(0, 10, 50), field_count=10):
+    results = []
+    for handler_count in handler_counts:
+        plain_model, event_model = make_model_pair('Save', field_count, handler_count)
+        plain_obj = plain_model.objects.create()
+        event_obj = event_model.objects.create()
+
+        results.append(Result(
+            'save', f'{handler_count} handlers',
+            measure(lambda: _change_and_save(plain_obj), 200),
+            measure(lambda: _change_and_save(event_obj), 200),
+            'us/save',
+        ))
+    return results
+
+
+def bench_diff(field_counts=(10, 50, 100)):
+    results = []
+    for field_count in field_counts:
+        event_model = make_model('Diff', EventActionModel, field_count)
+        dirty_model = make_model('DirtyDiff', EventActionModel, field_count, extra_attrs={'track_dirty_fields': True})
+
+        event_obj = event_model.objects.create()
+        event_obj.field_0 = 1
+        dirty_obj = dirty_model.objects.create()
+        dirty_obj.field_0 = 1
+
+        results.append(Result(
+            'diff', f'{field_count} fields', None, measure(lambda: event_obj.diff, ROW_COUNT), 'us/diff',
+        ))
+        results.append(Result(
+            'diff (dirty fields)', f'{field_count} fields', None, measure(lambda: dirty_obj.diff, ROW_COUNT), 'us/diff',
+        ))
+    return results
+
+
+def bench_fk_fan_out(children_counts=(0, 10, 100, 1000)):
+    results = []
+    for children_count in children_counts:
+        plain_parent, plain_child = make_fk_models(models.Model, child_handler=False)
+        event_parent, event_child = make_fk_models(EventActionModel)
+
+        plain_obj = plain_parent.objects.create()
+        event_obj = event_parent.objects.create()
+        plain_child.objects.bulk_create([plain_child(parent=plain_obj) for _ in range(children_count)])
+        event_child.objects.bulk_create([event_child(parent=event_obj) for _ in range(children_count)])
+
+        results.append(Result(
+            'fk fan-out', f'{children_count} children',
+            measure(lambda: _change_and_save(plain_obj), 20),
+            measure(lambda: _change_and_save(event_obj), 20),
+            'us/save',
+        ))
+    return results
+
+
+def bench_memory(field_count=10):
+    plain_model, event_model = make_model_pair('Memory', field_count)
+    for model in (plain_model, event_model):
+        model.objects.bulk_create([model() for _ in range(ROW_COUNT)])
+
+    return [Result(
+        'memory', f'{field_count} fields',
+        _measure_memory(plain_model) / ROW_COUNT,
+        _measure_memory(event_model) / ROW_COUNT,
+        'bytes/row',
+    )]
+
+
+def _change_and_save(obj):
+    obj.field_0 += 1
+    obj.save()
+
+
+def _measure_memory(model):
+    queryset = model.objects.all()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        snapshot = tracemalloc.take_snapshot()
+        objs = list(queryset)
+        size = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(snapshot, 'filename'))
+    finally:
+        tracemalloc.stop()
+    del objs
+    return size
+
+
+BENCHMARKS = {
+    'instantiation': bench_instantiation,
+    'save': bench_save,
+    'diff': bench_diff,
+    'fk_fan_out': bench_fk_fan_out,
+    'memory': bench_memory,
+}
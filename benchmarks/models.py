@@ -0,0 +1,67 @@
+"""Factories of the benchmark models, the plain baselines and the event action models are alike"""
+import itertools
+
+from django.db import connection, models
+
+from event_actions.decorators import FKChangeEvent, PostSaveEvent, PreSaveEvent
+from event_actions.models import EventActionModel
+
+_model_ids = itertools.count()
+
+
+def make_model(name, base, field_count, handler_count=0, extra_attrs=None):
+    """
+    Create a model with 'field_count' integer fields named field_0, field_1, ... and
+    'handler_count' handlers which watch the fields in turn, half of them pre save and the
+    other half post save handlers, then create its table.
+    """
+    attrs = {
+        '__module__': __name__,
+        'Meta': type('Meta', (), {'app_label': 'tests'}),
+    }
+    for i in range(field_count):
+        attrs[f'field_{i}'] = models.IntegerField(default=0)
+
+    for i in range(handler_count):
+        event = PreSaveEvent if i % 2 else PostSaveEvent
+        attrs[f'handler_{i}'] = event(field=f'field_{i % field_count}')(_make_handler(f'handler_{i}'))
+
+    attrs.update(extra_attrs or {})
+    model = type(f'{name}{next(_model_ids)}', (base,), attrs)
+
+    with connection.schema_editor() as schema_editor:
+        schema_editor.create_model(model)
+    return model
+
+
+def make_fk_models(base, child_handler=True):
+    """
+    Create a parent model and a child model whose objects point to the parent,
+    the FK_CHANGE handler of the children is called when the parent is changed.
+    """
+    parent = make_model('Parent', base, 1)
+
+    extra_attrs = {'parent': models.ForeignKey(parent, on_delete=models.CASCADE)}
+    if child_handler:
+        extra_attrs['parent_changed'] = FKChangeEvent(field='parent')(_make_handler('parent_changed'))
+    child = make_model('Child', base, 1, extra_attrs=extra_attrs)
+
+    return parent, child
+
+
+def make_model_pair(name, field_count, handler_count=0):
+    """
+    Return a plain model and an EventActionModel with the same fields.
+    """
+    return (
+        make_model(f'Plain{name}', models.Model, field_count),
+        make_model(f'Event{name}', EventActionModel, field_count, handler_count),
+    )
+
+
+def _make_handler(name):
+    def handler(self):
+        pass
+
+    handler.__name__ = name
+    return handler
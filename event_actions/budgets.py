@@ -0,0 +1,84 @@
+"""Query budgets of the handlers and the events"""
+import functools
+import logging
+from contextlib import contextmanager, nullcontext
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connections, router
+from django.dispatch import receiver
+
+from . import constants, instrumentation
+from .exceptions import QueryBudgetExceeded
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def get_mode():
+    """
+    Return 'warn', 'raise' or None if the budgets are not checked, by default they are checked in DEBUG.
+    """
+    default = constants.QUERY_BUDGET_WARN if settings.DEBUG else None
+    return getattr(settings, 'EVENT_ACTIONS_QUERY_BUDGET_MODE', default)
+
+
+@functools.lru_cache(maxsize=None)
+def get_event_budget(model, event_type):
+    """
+    Return the query budget of the event of the model from the EVENT_ACTIONS_QUERY_BUDGETS setting.
+
+    The setting is in the format of {'app_label.Model.event_type': 10, 'app_label.Model.event_type.handler': 2, }
+    """
+    return getattr(settings, 'EVENT_ACTIONS_QUERY_BUDGETS', {}).get(f'{model._meta.label}.{event_type}')
+
+
+@functools.lru_cache(maxsize=None)
+def get_handler_budget(model, handler):
+    """
+    Return the query budget of the handler, the max_queries of the decorator overrides the setting.
+    """
+    if handler.max_queries is not None:
+        return handler.max_queries
+    return get_event_budget(model, f'{handler.event_type}.{handler.name}')
+
+
+@receiver(setting_changed)
+def clear_budgets_cache(setting, **kwargs):
+    if setting in ('DEBUG', 'EVENT_ACTIONS_QUERY_BUDGET_MODE', 'EVENT_ACTIONS_QUERY_BUDGETS'):
+        get_mode.cache_clear()
+        get_event_budget.cache_clear()
+        get_handler_budget.cache_clear()
+
+
+def query_budget(model, event_type, using=None):
+    """
+    Return a context manager which checks the queries executed in it against the budget of the event.
+    """
+    if get_mode() is None:
+        return nullcontext()
+    budget = get_event_budget(model, event_type)
+    if budget is None:
+        return nullcontext()
+    return _check_query_budget(f'{model._meta.label}.{event_type}', budget, using or router.db_for_write(model))
+
+
+@contextmanager
+def _check_query_budget(name, budget, using):
+    counter = instrumentation.QueryCounter()
+    with connections[using].execute_wrapper(counter):
+        yield
+    check_queries(name, counter.count, budget)
+
+
+def check_queries(name, queries, budget):
+    """
+    Warn or raise QueryBudgetExceeded if the queries exceeded the budget.
+    """
+    if queries <= budget:
+        return
+
+    message = f'{name} executed {queries} queries, its budget is {budget} queries'
+    if get_mode() == constants.QUERY_BUDGET_RAISE:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
@@ -14,3 +14,51 @@ M2M_CHANGE = 'm2m_change'
 
 # a set that contains event related to django's Related fields
 RELATED_CHANGES = {FK_CHANGE, M2M_CHANGE}
+
+# a set that contains the events called after the changes are written to the database
+POST_EVENTS = {POST_CREATE, POST_SAVE, POST_DELETE}
+
+# a set that contains the events which can be coalesced in a transaction
+COALESCED_EVENTS = {POST_CREATE, POST_SAVE}
+
+# the default options of the relations for notifying the related objects of FK_CHANGE
+FK_CHANGE_CHUNK_SIZE = 2000
+FK_CHANGE_RAISE = 'raise'
+FK_CHANGE_SKIP = 'skip'
+
+# the handlers to call when an event is dispatched from asave() or adelete(),
+# the async handlers are awaited in the event loop and the others are called in a thread
+SYNC_HANDLERS = 'sync'
+ASYNC_HANDLERS = 'async'
+
+# the options of the thread pool which calls the background handlers,
+# configured with the EVENT_ACTIONS_BACKGROUND setting
+BACKGROUND_MAX_WORKERS = 4
+BACKGROUND_QUEUE_SIZE = 1000
+BACKGROUND_BLOCK = 'block'
+BACKGROUND_DROP = 'drop'
+BACKGROUND_INLINE = 'inline'
+BACKGROUND_ON_FULL_POLICIES = {BACKGROUND_BLOCK, BACKGROUND_DROP, BACKGROUND_INLINE}
+
+# the options of draining the outbox events
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 5
+# the delay in seconds before retrying a failed outbox event, doubled after each attempt up to the max
+OUTBOX_RETRY_DELAY = 1
+OUTBOX_MAX_RETRY_DELAY = 300
+
+# the upper bounds of the latency histogram of the handlers in milliseconds
+METRICS_LATENCY_BUCKETS = (1, 5, 10, 50, 100, 500, 1000)
+
+# what to do when a handler or an event executes more queries than its budget,
+# configured with the EVENT_ACTIONS_QUERY_BUDGET_MODE setting
+QUERY_BUDGET_WARN = 'warn'
+QUERY_BUDGET_RAISE = 'raise'
+
+# the value of 'digest_fields' to keep the digests of all of the text, JSON and binary fields
+LARGE_FIELDS = '__large__'
+# the size of the digests of the fields in bytes
+DIGEST_SIZE = 16
+
+# the value of 'track_fields' to compare all of the fields in the diff
+ALL_FIELDS = '__all__'
@@ -1,7 +1,15 @@
 """Decorators to use as events"""
+import asyncio
+import copy
+import inspect
+from functools import partial
 
-from . import constants
+from asgiref.sync import async_to_sync
+from django.db import transaction
+
+from . import budgets, constants, executor, instrumentation, metrics
 from .exceptions import IllegalArgumentError
+from .outbox.records import add_outbox_record
 
 
 class InnerEventDecorator:
@@ -26,13 +34,33 @@ class InnerEventDecorator:
         self.field = kwargs.pop('field', None)
         self.prev = kwargs.pop('prev', None)
         self.new = kwargs.pop('new', None)
+        self.batch = kwargs.pop('batch', False)
+        self.on_commit = kwargs.pop('on_commit', None)
+        self.coalesce = kwargs.pop('coalesce', None)
+        self.background = kwargs.pop('background', False)
+        self.outbox = kwargs.pop('outbox', False)
+        self.max_queries = kwargs.pop('max_queries', None)
+        self.name = func.__name__
+        self.event_type = event_type
 
         self._validate_decorator_args()
         self.check_trigger_function = self._get_trigger_check_function()
 
-        self.event_type = event_type
         self.func = func
         self.is_related_event = event_type in constants.RELATED_CHANGES
+        self.is_async = asyncio.iscoroutinefunction(func)
+
+        # The handler can only trigger if this field is changed, None if it doesn't depend on a field
+        if self.field is not None:
+            self.watched_field = self.field
+        else:
+            self.watched_field = self.fields[0] if self.fields else None
+
+        # The handler receives the diff if it accepts a 'diff' argument, or 'diffs' for the batch handlers
+        self.accepts_diff = self._accepts_argument(func, 'diffs' if self.batch else 'diff')
+        self.uses_diff = (
+            self.accepts_diff or self.outbox or self.check_trigger_function != self._no_arg_check_trigger_function
+        )
 
     def __set_name__(self, owner, name):
         """
@@ -42,6 +70,7 @@ class InnerEventDecorator:
         The event_types will be in the format of {'event_name': ['handler_function_1', ...], }
         """
         event = self.event_type
+        self.name = name
 
         # To avoid having a single event_types version in the subclasses
         # for more information check this:
@@ -61,13 +90,136 @@ class InnerEventDecorator:
     def __call__(self, func_self, *args, **kwargs):
         """
         When the class's instance is called, check and trigger the action if needed
+
+        A batch handler is called with the model and a list of the instance, or if a HandlerBatch
+        is passed, the instance is added to the batch to be called later with the other instances.
+
+        An async handler is called with async_to_sync, unless the ASYNC_HANDLERS are called
+        where the coroutine is returned to be awaited.
         """
         changed_related_field = kwargs.pop('_change_related', None)
+        diff_cache = kwargs.pop('_diff_cache', None)
+        batch = kwargs.pop('_batch', None)
+        handlers = kwargs.pop('_handlers', None)
+        pk = kwargs.pop('_pk', None)
+
+        # The coalesced handlers are only called with the net diff when the transaction is committed
+        if self.is_coalesced(func_self.__class__) != kwargs.pop('_coalesced', False):
+            return
 
-        do_trigger = self.check_trigger_function(func_self, changed_related_field=changed_related_field)
+        awaitable = handlers == constants.ASYNC_HANDLERS
+        if handlers is not None and self.is_awaited(func_self.__class__) != awaitable:
+            return
+        if awaitable:
+            kwargs['_awaitable'] = True
+
+        diff = None
+        if self.uses_diff:
+            diff = diff_cache.diff if diff_cache is not None else func_self.diff
+
+        do_trigger = self.check_trigger_function(func_self, diff, changed_related_field=changed_related_field)
         if not do_trigger:
+            if metrics.sink is not None:
+                metrics.record_rejected(func_self.__class__, self)
+            return
+
+        if self.outbox:
+            # The handler is called later by the outbox worker, the event is written in the transaction of the save
+            add_outbox_record(func_self, self, diff, pk=pk)
+            ret = None
+        elif self.batch:
+            if batch is not None:
+                batch.add(self, func_self, diff, diff_cache)
+                return
+            ret = self.call_batch(func_self.__class__, [func_self], [diff], *args, **kwargs)
+        else:
+            if self.accepts_diff:
+                kwargs['diff'] = diff
+            instance = copy.copy(func_self) if self.background else func_self
+            ret = self._call_func(func_self.__class__, func_self._state.db, instance, *args, **kwargs)
+
+        if diff_cache is not None:
+            diff_cache.handler_called()
+
+        return ret
+
+    def call_batch(self, model, instances, diffs, *args, **kwargs):
+        """
+        Call the batch handler with the model and the instances that triggered it.
+        """
+        if self.accepts_diff:
+            kwargs['diffs'] = diffs
+        using = instances[0]._state.db
+        if self.background:
+            instances = [copy.copy(instance) for instance in instances]
+        return self._call_func(model, using, model, instances, *args, **kwargs)
+
+    def call_outbox(self, instance, diff):
+        """
+        Call the outbox handler with the instance and the diff stored in its OutboxEvent.
+        """
+        func = async_to_sync(self.func) if self.is_async else self.func
+        max_queries = budgets.get_handler_budget(instance.__class__, self) if budgets.get_mode() is not None else None
+        if instrumentation.enabled or max_queries is not None:
+            func = instrumentation.instrument(
+                func, instance.__class__, self, instance._state.db, max_queries=max_queries,
+            )
+        if self.accepts_diff:
+            return func(instance, diff=diff)
+        return func(instance)
+
+    def is_coalesced(self, model):
+        """
+        Return True if the handler is called once per transaction with the net diff of the saves.
+        """
+        if self.outbox:
+            return False
+        if self.coalesce is not None:
+            return self.coalesce
+        return self.event_type in constants.COALESCED_EVENTS and model.coalesce_post_actions
+
+    def is_awaited(self, model):
+        """
+        Return True if the handler is awaited in the event loop by asave() and adelete().
+        """
+        return self.is_async and not self.background and not self.outbox and not self.is_deferred(model)
+
+    def is_deferred(self, model):
+        """
+        Return True if the handler should be called when the transaction is committed.
+        """
+        if self.on_commit is not None:
+            return self.on_commit
+        return self.event_type in constants.POST_EVENTS and model.post_actions_on_commit
+
+    def _call_func(self, model, using, *args, _awaitable=False, **kwargs):
+        """
+        Call the handler now or, if it's deferred, when the transaction of the database is committed.
+        """
+        func = self.func
+        if self.is_async and not _awaitable:
+            func = async_to_sync(func)
+        max_queries = budgets.get_handler_budget(model, self) if budgets.get_mode() is not None else None
+        if instrumentation.enabled or max_queries is not None:
+            func = instrumentation.instrument(func, model, self, using, awaitable=_awaitable, max_queries=max_queries)
+        if self.background:
+            func = partial(executor.submit, func)
+
+        if self.is_deferred(model):
+            transaction.on_commit(partial(func, *args, **kwargs), using=using)
             return
-        return self.func(func_self, *args, **kwargs)
+        return func(*args, **kwargs)
+
+    @staticmethod
+    def _accepts_argument(func, name):
+        """
+        Return True if the function has an argument with the given name.
+        """
+        try:
+            parameters = inspect.signature(func).parameters
+        except (TypeError, ValueError):
+            return False
+        return name in parameters
 
     def _no_arg_check_trigger_function(self, outer_ref, *args, **kwargs):
         """
@@ -77,7 +229,7 @@ class InnerEventDecorator:
         """
         return True
 
-    def _fields_arg_check_trigger_function(self, outer_self, *args, **kwargs):
+    def _fields_arg_check_trigger_function(self, outer_self, diff, *args, **kwargs):
         """
         A handler for the decorators with only 'fields' argument.
 
@@ -86,15 +238,13 @@ class InnerEventDecorator:
         """
         changed_related_field = kwargs.pop('changed_related_field', None)
 
+        changed_fields = set(diff)
         if changed_related_field:
-            changed_related_field = [changed_related_field]
-        else:
-            changed_related_field = []
+            changed_fields.add(changed_related_field)
 
-        changed_fields = changed_related_field + list(outer_self.changed_fields)
-        return set(self.fields) <= set(changed_fields)
+        return set(self.fields) <= changed_fields
 
-    def _plain_field_arg_check_trigger_function(self, outer_self, *args, **kwargs):
+    def _plain_field_arg_check_trigger_function(self, outer_self, diff, *args, **kwargs):
         """
         A handler for the decorators with only 'field' argument.
 
@@ -103,53 +253,37 @@ class InnerEventDecorator:
         """
         changed_related_field = kwargs.pop('changed_related_field', None)
 
-        if changed_related_field:
-            changed_related_field = [changed_related_field]
-        else:
-            changed_related_field = []
-
-        changed_fields = changed_related_field + list(outer_self.changed_fields)
-        return self.field in changed_fields
+        return self.field == changed_related_field or self.field in diff
 
-    def _field_arg_with_prev_check_trigger_function(self, outer_self, *args, **kwargs):
+    def _field_arg_with_prev_check_trigger_function(self, outer_self, diff, *args, **kwargs):
         """
         A handler for the decorators with 'field' and 'prev' argument.
 
         Return True if the 'field' value is changed and also previous 'field' value was equal to 'prev',
         otherwise return False.
         """
-        trigger = False
-        if self._plain_field_arg_check_trigger_function(outer_self):
-            prev_value = outer_self.get_prev_value(self.field)
-            if prev_value == self.prev:
-                trigger = True
+        field_diff = diff.get(self.field)
+        return field_diff is not None and field_diff[0] == self.prev
 
-        return trigger
-
-    def _field_arg_with_new_check_trigger_function(self, outer_self, *args, **kwargs):
+    def _field_arg_with_new_check_trigger_function(self, outer_self, diff, *args, **kwargs):
         """
         A handler for the decorators with 'field' and 'new' argument.
 
         Return True if the 'field's value is changed and also 'field's new value is equal to 'new',
         otherwise return False.
         """
-        trigger = False
-        if self._plain_field_arg_check_trigger_function(outer_self):
-            new_val = outer_self.get_new_value(self.field)
-            if new_val == self.new:
-                trigger = True
-
-        return trigger
+        field_diff = diff.get(self.field)
+        return field_diff is not None and field_diff[1] == self.new
 
-    def _field_arg_with_new_and_prev_check_trigger_function(self, outer_self, *args, **kwargs):
+    def _field_arg_with_new_and_prev_check_trigger_function(self, outer_self, diff, *args, **kwargs):
         """
         A handler for the decorators with 'field', 'prev' and 'new' argument.
 
         Return True if the 'field's value is changed from 'prev' to 'new',
         otherwise return False.
         """
-        prev_ok = self._field_arg_with_prev_check_trigger_function(outer_self)
-        new_ok = self._field_arg_with_new_check_trigger_function(outer_self)
+        prev_ok = self._field_arg_with_prev_check_trigger_function(outer_self, diff)
+        new_ok = self._field_arg_with_new_check_trigger_function(outer_self, diff)
 
         return prev_ok and new_ok
 
@@ -235,6 +369,58 @@ class InnerEventDecorator:
                 'the field should not be None.'
             )
 
+    def _validate_on_commit(self):
+        """
+        Check that only the post events are deferred to the transaction commit,
+        otherwise return IllegalArgumentError.
+        """
+        if self.on_commit and self.event_type not in constants.POST_EVENTS:
+            raise IllegalArgumentError(
+                f'Only the post events can be called on commit, allowed events are {constants.POST_EVENTS}'
+            )
+
+    def _validate_coalesce(self):
+        """
+        Check that only the coalescable post events are coalesced, otherwise return IllegalArgumentError.
+        """
+        if self.coalesce and self.event_type not in constants.COALESCED_EVENTS:
+            raise IllegalArgumentError(
+                f'Only the post create and save events can be coalesced, '
+                f'allowed events are {constants.COALESCED_EVENTS}'
+            )
+
+    def _validate_background(self):
+        """
+        Check that only the post events are called in the background, otherwise return IllegalArgumentError.
+        """
+        if self.background and self.event_type not in constants.POST_EVENTS:
+            raise IllegalArgumentError(
+                f'Only the post events can be called in the background, allowed events are {constants.POST_EVENTS}'
+            )
+
+    def _validate_outbox(self):
+        """
+        Check that only the post events are written to the outbox and the handler is not
+        called in any other way, otherwise return IllegalArgumentError.
+        """
+        if not self.outbox:
+            return
+        if self.event_type not in constants.POST_EVENTS:
+            raise IllegalArgumentError(
+                f'Only the post events can be written to the outbox, allowed events are {constants.POST_EVENTS}'
+            )
+        if self.batch or self.background or self.on_commit or self.coalesce:
+            raise IllegalArgumentError(
+                'The outbox handlers can not be batch, background, on_commit or coalesced handlers'
+            )
+
+    def _validate_max_queries(self):
+        """
+        Check that the query budget is a non-negative integer, otherwise return IllegalArgumentError.
+        """
+        if self.max_queries is not None and (not isinstance(self.max_queries, int) or self.max_queries < 0):
+            raise IllegalArgumentError(f'max_queries should be a non-negative integer, got {self.max_queries!r}')
+
     def _validate_decorator_args(self):
         """
         Validate the compatibility of the passed arguments to the decorator.
@@ -242,6 +428,11 @@ class InnerEventDecorator:
         self._validate_valid_args()
         self._validate_multiple_fields()
         self._validate_one_field()
+        self._validate_on_commit()
+        self._validate_coalesce()
+        self._validate_background()
+        self._validate_outbox()
+        self._validate_max_queries()
 
 
 class InnerEventDecoratorFactory:
@@ -252,6 +443,26 @@ class InnerEventDecoratorFactory:
     instance which will be used as actual decorator and will set the 'field' and 'perv' instance
     variables to 'Foo' and 'Bar'.
 
+    Passing on_commit=True defers a post event handler until the transaction is committed,
+    the handler is not called if the transaction is rolled back. on_commit=False calls it
+    immediately even if the model sets 'post_actions_on_commit'.
+
+    Passing coalesce=True to a post create or save event calls the handler once per transaction
+    and object when the transaction is committed, with the net diff of all of the saves.
+
+    Passing batch=True makes the handler a batch handler, it's called like a classmethod with
+    the model and the list of the instances that triggered the event (and their 'diffs' if the
+    handler accepts it) once per bulk operation.
+
+    Passing background=True to a post event submits the handler to the background thread pool,
+    the handler gets a copy of the instance and the diff captured at the event.
+
+    Passing outbox=True to a post event writes an OutboxEvent in the transaction of the save instead
+    of calling the handler, the drain_outbox command calls it later with the object and the diff.
+
+    Passing max_queries=N sets the query budget of the handler, a call which executes more queries
+    warns or raises QueryBudgetExceeded based on the EVENT_ACTIONS_QUERY_BUDGET_MODE setting.
+
     For subclassing the 'event_type' should be a unique string and the 'valid_args' should be an
     iterable object to restrict the passed arguments to the decorator or a '*' to accept anything.
     """
@@ -0,0 +1,68 @@
+"""Comparing the large fields by the digests of their values"""
+import functools
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+from . import constants
+
+
+def digest_text(value):
+    return hashlib.blake2b(str(value).encode(), digest_size=constants.DIGEST_SIZE).digest()
+
+
+def digest_binary(value):
+    return hashlib.blake2b(value, digest_size=constants.DIGEST_SIZE).digest()
+
+
+def digest_json(value, encoder=DjangoJSONEncoder):
+    # The dicts are compared regardless of the order of their keys
+    data = json.dumps(value, sort_keys=True, cls=encoder).encode()
+    return hashlib.blake2b(data, digest_size=constants.DIGEST_SIZE).digest()
+
+
+class Digest:
+    """
+    The digest of a field's value, kept in the snapshot instead of the value.
+
+    It is equal to the values with the same digest, so it's compared with the current value
+    of the field like the value itself. It's the previous value of the field in the diff.
+    """
+
+    __slots__ = ('digest', 'digest_function')
+
+    def __init__(self, value, digest_function):
+        self.digest_function = digest_function
+        self.digest = None if value is None else digest_function(value)
+
+    def __eq__(self, other):
+        if isinstance(other, Digest):
+            return self.digest == other.digest
+        return self.digest == (None if other is None else self.digest_function(other))
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __repr__(self):
+        return f'<Digest {self.digest.hex() if self.digest is not None else None}>'
+
+    def hexdigest(self):
+        return self.digest.hex() if self.digest is not None else None
+
+
+def get_digest_function(field):
+    """
+    Return the digest function of the field, None if its values are not large.
+    """
+    if isinstance(field, models.JSONField):
+        # The values are serialized like the field does
+        if field.encoder is not None:
+            return functools.partial(digest_json, encoder=field.encoder)
+        return digest_json
+    if isinstance(field, models.BinaryField):
+        return digest_binary
+    if isinstance(field, models.TextField):
+        return digest_text
+    return None
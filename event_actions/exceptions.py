@@ -3,3 +3,17 @@ class IllegalArgumentError(ValueError):
     Raise when incompatible arguments are passed to decorators
     """
     pass
+
+
+class FKChangeLimitExceeded(Exception):
+    """
+    Raise when a saved object is referenced by more objects than the FK change limit of the relation
+    """
+    pass
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raise when a handler or an event executes more queries than its query budget
+    """
+    pass
@@ -0,0 +1,143 @@
+"""A bounded thread pool to call the background handlers out of the request"""
+import atexit
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import constants
+from .exceptions import IllegalArgumentError
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class BackgroundExecutor:
+    """
+    Call the submitted functions in a pool of worker threads.
+
+    The functions wait in a queue of 'queue_size' items, when the queue is full 'on_full'
+    decides to 'block' until there is room in the queue, 'drop' the function or call it 'inline'.
+    """
+
+    def __init__(self, max_workers=constants.BACKGROUND_MAX_WORKERS, queue_size=constants.BACKGROUND_QUEUE_SIZE,
+                 on_full=constants.BACKGROUND_BLOCK):
+        if on_full not in constants.BACKGROUND_ON_FULL_POLICIES:
+            raise IllegalArgumentError(
+                f'The on_full policy should be one of {constants.BACKGROUND_ON_FULL_POLICIES}, got {on_full!r}'
+            )
+
+        self.max_workers = max_workers
+        self.on_full = on_full
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._shutdown = False
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Queue the function to be called in a worker thread.
+        """
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError('Cannot submit to the background executor after the shutdown')
+            self._start_workers()
+
+        task = (func, args, kwargs)
+        try:
+            self._queue.put_nowait(task)
+        except queue.Full:
+            if self.on_full == constants.BACKGROUND_BLOCK:
+                self._queue.put(task)
+            elif self.on_full == constants.BACKGROUND_DROP:
+                logger.warning('The background queue is full, %r is dropped', func)
+            else:
+                self._run(task)
+
+    def drain(self):
+        """
+        Wait until all of the queued functions are called.
+        """
+        self._queue.join()
+
+    def shutdown(self, wait=True):
+        """
+        Stop the workers after the queued functions are called.
+        """
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+
+        for _ in self._threads:
+            self._queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _start_workers(self):
+        # The workers are started on the first submit, so importing the models doesn't start threads
+        while len(self._threads) < self.max_workers:
+            thread = threading.Thread(
+                target=self._work, name=f'event_actions_{len(self._threads)}', daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    return
+                self._run(task)
+                # The workers live longer than a request, don't keep the connections of the handlers open
+                close_old_connections()
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _run(task):
+        func, args, kwargs = task
+        try:
+            func(*args, **kwargs)
+        except Exception:
+            logger.exception('The background handler %r failed', func)
+
+
+def get_executor():
+    """
+    Return the background executor, created with the EVENT_ACTIONS_BACKGROUND setting on the first call.
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = BackgroundExecutor(**getattr(settings, 'EVENT_ACTIONS_BACKGROUND', {}))
+            atexit.register(_executor.shutdown)
+        return _executor
+
+
+def submit(func, *args, **kwargs):
+    """
+    Queue the function to be called in the background executor.
+    """
+    get_executor().submit(func, *args, **kwargs)
+
+
+def shutdown_executor(wait=True):
+    """
+    Drain and stop the background executor, a new one is created on the next submit.
+    """
+    global _executor
+
+    with _executor_lock:
+        executor, _executor = _executor, None
+
+    if executor is not None:
+        atexit.unregister(executor.shutdown)
+        executor.shutdown(wait=wait)
@@ -0,0 +1,86 @@
+"""Measuring the handler calls for the metrics, the profiling and the query budgets"""
+import functools
+import time
+
+from django.db import connections, router
+
+from . import budgets, metrics, profiling
+
+# True if any of the metrics or the profiling is enabled, otherwise the handlers are not wrapped
+enabled = False
+
+
+def update_enabled():
+    """
+    Update 'enabled' after the metrics sink or the profiling options are changed.
+    """
+    global enabled
+    enabled = (
+        metrics.sink is not None
+        or profiling.slow_handler_threshold is not None
+        or profiling.profile_every is not None
+    )
+
+
+class QueryCounter:
+    """
+    A database execute wrapper which counts the queries.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def instrument(func, model, handler, using, awaitable=False, max_queries=None):
+    """
+    Wrap the handler function to measure its duration and the queries it executes on the 'using' database.
+
+    If 'max_queries' is passed, the queries are checked against it after the handler returns.
+    """
+    label = model._meta.label
+    if using is None:
+        # The objects which are not created yet
+        using = router.db_for_write(model)
+
+    def finish(args, start, counter):
+        duration = time.perf_counter() - start
+        sink = metrics.sink
+        if sink is not None:
+            sink.record_call(label, handler.event_type, handler.name, duration, counter.count)
+        profiling.check_slow_handler(label, handler, args, duration, counter.count)
+
+    if awaitable:
+        @functools.wraps(func)
+        async def instrumented(*args, **kwargs):
+            # The queries of the async handlers run in other threads and are not counted
+            counter = QueryCounter()
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                finish(args, start, counter)
+
+        return instrumented
+
+    @functools.wraps(func)
+    def instrumented(*args, **kwargs):
+        counter = QueryCounter()
+        profile = profiling.start_profile()
+        start = time.perf_counter()
+        try:
+            with connections[using].execute_wrapper(counter):
+                ret = func(*args, **kwargs)
+        finally:
+            if profile is not None:
+                profiling.stop_profile(profile)
+            finish(args, start, counter)
+
+        if max_queries is not None:
+            budgets.check_queries(f'{label}.{handler.event_type}.{handler.name}', counter.count, max_queries)
+        return ret
+
+    return instrumented
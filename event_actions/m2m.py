@@ -0,0 +1,139 @@
+"""Dispatching the M2M_CHANGE events of the many-to-many fields"""
+from collections import namedtuple
+from contextlib import contextmanager
+
+from asgiref.local import Local
+from django.db.models.fields.related_descriptors import ManyToManyDescriptor
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+
+# The change of a many-to-many field, 'added' and 'removed' are frozensets of the primary keys
+# of the related objects and 'cleared' is True if the field is cleared
+M2MChange = namedtuple('M2MChange', ['added', 'removed', 'cleared'])
+
+# The changes of the running set() calls and the primary keys of the running clear() calls
+# in the format of {(id(instance), field_name): ...}
+_state = Local()
+
+
+def _get_state(name):
+    state = getattr(_state, name, None)
+    if state is None:
+        state = {}
+        setattr(_state, name, state)
+    return state
+
+
+class M2MChangeCollector:
+    """
+    Merge the changes of the add(), remove() and clear() calls of a set() call.
+    """
+
+    def __init__(self):
+        self.added = set()
+        self.removed = set()
+        self.cleared = False
+
+    def add(self, added, removed, cleared):
+        # An object removed and added again, e.g. by set(clear=True), is not changed
+        self.removed.update(removed - self.added)
+        self.added.difference_update(removed)
+        self.added.update(added - self.removed)
+        self.removed.difference_update(added)
+        self.cleared = self.cleared or cleared
+
+    def get_change(self):
+        if not self.added and not self.removed and not self.cleared:
+            return None
+        return M2MChange(frozenset(self.added), frozenset(self.removed), self.cleared)
+
+
+@contextmanager
+def collect_m2m_changes(instance, field_name):
+    """
+    Dispatch the changes of the field made in the block as a single M2M_CHANGE event.
+    """
+    key = (id(instance), field_name)
+    collectors = _get_state('collectors')
+    if key in collectors:
+        yield
+        return
+
+    collectors[key] = collector = M2MChangeCollector()
+    try:
+        yield
+    finally:
+        del collectors[key]
+
+    change = collector.get_change()
+    if change is not None:
+        instance._m2m_changed(field_name, change)
+
+
+class M2MChangeDescriptor(ManyToManyDescriptor):
+    """
+    The descriptor of the many-to-many fields whose related manager's set() dispatches one event.
+    """
+
+    @cached_property
+    def related_manager_cls(self):
+        manager_cls = super().related_manager_cls
+        field_name = self.field.name
+
+        class EventActionManyRelatedManager(manager_cls):
+            def set(self, *args, **kwargs):
+                with collect_m2m_changes(self.instance, field_name):
+                    return super().set(*args, **kwargs)
+            set.alters_data = True
+
+        return EventActionManyRelatedManager
+
+
+def install_m2m_descriptors(model):
+    """
+    Replace the descriptors of the model's many-to-many fields with M2MChangeDescriptors.
+    """
+    for field in model._meta.local_many_to_many:
+        descriptor = vars(model).get(field.name)
+        if type(descriptor) is ManyToManyDescriptor and not descriptor.reverse:
+            setattr(model, field.name, M2MChangeDescriptor(field.remote_field, reverse=False))
+
+
+@receiver(m2m_changed)
+def dispatch_m2m_change(sender, instance, action, reverse, model, pk_set, using, **kwargs):
+    """
+    Call the M2M_CHANGE actions of the instance with the primary keys of the changed objects.
+
+    The changes made from the reverse side of the relation are not dispatched.
+    """
+    watches_m2m = getattr(instance, '_watches_m2m', None)
+    if reverse or watches_m2m is None:
+        return
+
+    field_name = instance._get_m2m_field_name(sender)
+    if field_name is None or not watches_m2m(field_name):
+        return
+
+    key = (id(instance), field_name)
+    added, removed, cleared = frozenset(), frozenset(), False
+    if action == 'pre_clear':
+        # The post_clear signal doesn't have the primary keys of the cleared objects
+        _get_state('cleared')[key] = frozenset(
+            getattr(instance, field_name).using(using).values_list('pk', flat=True)
+        )
+        return
+    elif action == 'post_clear':
+        removed, cleared = _get_state('cleared').pop(key, frozenset()), True
+    elif action == 'post_add':
+        added = frozenset(pk_set)
+    elif action == 'post_remove':
+        removed = frozenset(pk_set)
+    else:
+        return
+
+    collector = _get_state('collectors').get(key)
+    if collector is not None:
+        collector.add(added, removed, cleared)
+    elif added or removed or cleared:
+        instance._m2m_changed(field_name, M2MChange(added, removed, cleared))
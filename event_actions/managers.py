@@ -0,0 +1,228 @@
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections, models, transaction
+
+from . import constants
+from .mixins import DiffCache, HandlerBatch
+from .outbox.records import collect_outbox_records
+
+
+class EventActionQuerySet(models.QuerySet):
+    """
+    A QuerySet which calls the create and save events of the objects for the bulk operations.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._events_disabled = False
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._events_disabled = self._events_disabled
+        return clone
+
+    def _without_events(self):
+        """
+        Return a copy of the QuerySet whose operations don't call the events.
+        """
+        clone = self._chain()
+        clone._events_disabled = True
+        return clone
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Call the PRE_CREATE actions of the objects, create them in batches and call the POST_CREATE actions.
+
+        The batch handlers are called once with all of the objects that triggered them.
+        The objects of the models with POST_CREATE handlers can't be created with ignore_conflicts,
+        as the objects which are not inserted can't be told apart.
+        """
+        objs = list(objs)
+        ignore_conflicts = kwargs.get('ignore_conflicts', args[1] if len(args) > 1 else False)
+        if ignore_conflicts and constants.POST_CREATE in self.model._event_handlers:
+            raise ValueError(
+                f"Can't bulk create {self.model._meta.label} objects with ignore_conflicts, the POST_CREATE "
+                f"handlers would be called for the objects which are not inserted."
+            )
+        if (
+            constants.POST_CREATE in self.model._outbox_events
+            and not connections[self.db].features.can_return_rows_from_bulk_insert
+            and any(obj.pk is None for obj in objs)
+        ):
+            # The outbox events couldn't be called without the primary keys of the objects
+            raise ValueError(
+                f"Can't bulk create {self.model._meta.label} objects without primary keys, its outbox "
+                f"handlers need the primary keys which the database doesn't return."
+            )
+
+        with collect_outbox_records(self.model, self.db, (constants.POST_CREATE,)):
+            states = [(obj._initial_values, obj._get_dirty_fields()) for obj in objs]
+            batch = HandlerBatch(self.model)
+
+            for obj in objs:
+                obj._call_actions(constants.PRE_CREATE, _batch=batch)
+            batch.call_handlers()
+
+            created_objs = super().bulk_create(objs, *args, **kwargs)
+
+            for obj, (initial_values, dirty_fields) in zip(objs, states):
+                obj._reset_changes()
+                diff_cache = DiffCache(obj, initial_values, dirty_fields)
+                obj._call_post_actions(constants.POST_CREATE, diff_cache, batch)
+            batch.call_handlers()
+
+        return created_objs
+
+    def bulk_update(self, objs, fields=None, batch_size=None):
+        """
+        Call the PRE_SAVE actions of the objects, update them in batches and call the POST_SAVE actions.
+
+        If fields is not passed, the changed fields of the objects are updated, otherwise
+        the handlers are only checked against the changes of the updated fields.
+        The batch handlers are called once with all of the objects that triggered them.
+        """
+        update_fields = None if fields is None else frozenset(fields)
+        with collect_outbox_records(self.model, self.db, (constants.POST_SAVE,)):
+            objs = list(objs)
+            diff_caches = [DiffCache(obj, update_fields=update_fields) for obj in objs]
+            batch = HandlerBatch(self.model)
+
+            for obj, diff_cache in zip(objs, diff_caches):
+                obj._call_actions(constants.PRE_SAVE, diff_cache=diff_cache, _batch=batch)
+            batch.call_handlers()
+
+            if fields is None:
+                # The fields which are not tracked may be changed too
+                fields = set()
+                for obj, diff_cache in zip(objs, diff_caches):
+                    fields.update(obj._get_diff(diff_cache.initial_values, diff_cache.dirty_fields, all_fields=True))
+                fields = [field.name for field in self.model._meta.concrete_fields if field.name in fields]
+
+            rows = None
+            if fields:
+                # QuerySet.bulk_update() uses update(), the events are already called here
+                rows = super(EventActionQuerySet, self._without_events()).bulk_update(
+                    objs, fields, batch_size=batch_size,
+                )
+
+            post_diff_caches = []
+            for obj, diff_cache in zip(objs, diff_caches):
+                obj._reset_changes(fields)
+                # Post actions are checked against the changes before the update
+                diff_cache = DiffCache(
+                    obj, diff_cache.initial_values, diff_cache.dirty_fields, update_fields=update_fields,
+                )
+                obj._call_post_actions(constants.POST_SAVE, diff_cache, batch)
+                post_diff_caches.append(diff_cache)
+            batch.call_handlers()
+
+            for obj, diff_cache in zip(objs, post_diff_caches):
+                obj._call_related_objs(diff_cache)
+
+        return rows
+
+    def _get_update_fields(self, kwargs):
+        """
+        Return the fields of the update() keywords, None if any of them can't be updated.
+        """
+        fields = {}
+        for name in kwargs:
+            try:
+                field = self.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            if not field.concrete or field.many_to_many:
+                return None
+            fields[name] = field
+        return fields
+
+    @staticmethod
+    def _to_python(field, value):
+        """
+        Convert the value to the type of the field like it's loaded from the database, so the diff
+        doesn't have the changes of the type only (e.g. '6' to 6).
+        """
+        try:
+            return field.to_python(value)
+        except ValidationError:
+            # The update raises the error of the database for the invalid value
+            return value
+
+    def update(self, **kwargs):
+        """
+        Update the objects and call their PRE_SAVE and POST_SAVE actions.
+
+        The previous values of the updated fields and the results of the expressions (e.g. F())
+        are selected in a single query before the update, the other fields are deferred.
+        Changes made by the PRE_SAVE handlers are not saved.
+        """
+        model = self.model
+        handlers = model._event_handlers
+        # Django raises its own error for the sliced querysets
+        if self._events_disabled or self.query.is_sliced or (
+            constants.PRE_SAVE not in handlers
+            and constants.POST_SAVE not in handlers
+            and not model._get_fk_change_relations()
+        ):
+            return super().update(**kwargs)
+
+        fields = self._get_update_fields(kwargs)
+        if fields is None:
+            # Django raises its own error for the fields which can't be updated
+            return super().update(**kwargs)
+
+        with collect_outbox_records(model, self.db, (constants.POST_SAVE,)):
+            # The objects are assigned to the related fields, the other values to their attnames
+            values = {
+                name: (name, value) if isinstance(value, models.Model) else (fields[name].attname, self._to_python(fields[name], value))
+                for name, value in kwargs.items() if not hasattr(value, 'resolve_expression')
+            }
+            expressions = {
+                f'_event_actions_{fields[name].attname}': value
+                for name, value in kwargs.items() if hasattr(value, 'resolve_expression')
+            }
+
+            with transaction.atomic(using=self.db, savepoint=False):
+                # The objects are selected by their primary keys, as the queryset may not support
+                # only() (e.g. after values()) or SELECT ... FOR UPDATE (e.g. distinct() or outer joins)
+                objs = list(
+                    model._base_manager.using(self.db)
+                    .filter(pk__in=self.order_by().values('pk'))
+                    .select_for_update()
+                    .only(model._meta.pk.name, *(field.name for field in fields.values()))
+                    .annotate(**expressions)
+                )
+
+                for obj in objs:
+                    for name in kwargs:
+                        if name in values:
+                            setattr(obj, *values[name])
+                        else:
+                            setattr(obj, fields[name].attname, obj.__dict__.pop(f'_event_actions_{fields[name].attname}'))
+
+                diff_caches = [DiffCache(obj) for obj in objs]
+                batch = HandlerBatch(model)
+
+                for obj, diff_cache in zip(objs, diff_caches):
+                    obj._call_actions(constants.PRE_SAVE, diff_cache=diff_cache, _batch=batch)
+                batch.call_handlers()
+
+                rows = super().update(**kwargs)
+
+            post_diff_caches = []
+            for obj, diff_cache in zip(objs, diff_caches):
+                obj._reset_changes(fields)
+                diff_cache = DiffCache(obj, diff_cache.initial_values, diff_cache.dirty_fields)
+                obj._call_post_actions(constants.POST_SAVE, diff_cache, batch)
+                post_diff_caches.append(diff_cache)
+            batch.call_handlers()
+
+            for obj, diff_cache in zip(objs, post_diff_caches):
+                obj._call_related_objs(diff_cache)
+
+        return rows
+
+    update.alters_data = True
+
+
+class EventActionManager(models.Manager.from_queryset(EventActionQuerySet)):
+    pass
@@ -0,0 +1,144 @@
+"""Metrics of the handler calls"""
+import bisect
+import logging
+import threading
+
+from . import constants, instrumentation
+
+logger = logging.getLogger(__name__)
+
+# The sink which receives the metrics, the handlers are not instrumented when it's None
+sink = None
+
+
+def set_metrics_sink(new_sink):
+    """
+    Send the metrics of the handlers to the sink, pass None to disable the metrics.
+    """
+    global sink
+    sink = new_sink
+    instrumentation.update_enabled()
+
+
+class MetricsSink:
+    """
+    The base class of the sinks.
+
+    The handlers are identified by the model label, the event type and the handler name.
+    """
+
+    def record_call(self, model, event_type, handler, duration, queries):
+        """
+        Record a call of the handler which took 'duration' seconds and executed 'queries' queries.
+        """
+        raise NotImplementedError
+
+    def record_rejected(self, model, event_type, handler):
+        """
+        Record an event whose trigger conditions rejected the handler.
+        """
+        raise NotImplementedError
+
+
+class HandlerStats:
+    """
+    The aggregated metrics of a handler.
+
+    'histogram' has the number of the calls in each of the METRICS_LATENCY_BUCKETS milliseconds and
+    the calls slower than the last bucket.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.rejected = 0
+        self.total_duration = 0.0
+        self.queries = 0
+        self.histogram = [0] * (len(constants.METRICS_LATENCY_BUCKETS) + 1)
+
+    def __repr__(self):
+        return (
+            f'<HandlerStats calls={self.calls} rejected={self.rejected} '
+            f'total_duration={self.total_duration:.6f} queries={self.queries}>'
+        )
+
+
+class InMemorySink(MetricsSink):
+    """
+    Aggregate the metrics in memory in the format of {(model, event_type, handler): HandlerStats, }
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def record_call(self, model, event_type, handler, duration, queries):
+        bucket = bisect.bisect_left(constants.METRICS_LATENCY_BUCKETS, duration * 1000)
+        with self._lock:
+            stats = self._get_stats(model, event_type, handler)
+            stats.calls += 1
+            stats.total_duration += duration
+            stats.queries += queries
+            stats.histogram[bucket] += 1
+
+    def record_rejected(self, model, event_type, handler):
+        with self._lock:
+            self._get_stats(model, event_type, handler).rejected += 1
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+
+    def _get_stats(self, model, event_type, handler):
+        key = (model, event_type, handler)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = HandlerStats()
+        return stats
+
+
+class LoggingSink(MetricsSink):
+    """
+    Log each handler call.
+    """
+
+    def __init__(self, logger=logger, level=logging.DEBUG):
+        self.logger = logger
+        self.level = level
+
+    def record_call(self, model, event_type, handler, duration, queries):
+        self.logger.log(
+            self.level, '%s %s.%s took %.3fms and %d queries', event_type, model, handler, duration * 1000, queries,
+        )
+
+    def record_rejected(self, model, event_type, handler):
+        self.logger.log(self.level, '%s %s.%s was not triggered', event_type, model, handler)
+
+
+class CallbackSink(MetricsSink):
+    """
+    Call a statsd-style callback with (metric_name, value, tags) for each metric.
+
+    The metrics are 'event_actions.handler.duration' in milliseconds, 'event_actions.handler.queries'
+    and 'event_actions.handler.rejected', tagged with {'model': ..., 'event_type': ..., 'handler': ...}.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def record_call(self, model, event_type, handler, duration, queries):
+        tags = {'model': model, 'event_type': event_type, 'handler': handler}
+        self.callback('event_actions.handler.duration', duration * 1000, tags)
+        self.callback('event_actions.handler.queries', queries, tags)
+
+    def record_rejected(self, model, event_type, handler):
+        tags = {'model': model, 'event_type': event_type, 'handler': handler}
+        self.callback('event_actions.handler.rejected', 1, tags)
+
+
+def record_rejected(model, handler):
+    """
+    Record that the trigger conditions of the handler rejected the event.
+    """
+    current_sink = sink
+    if current_sink is not None:
+        current_sink.record_rejected(model._meta.label, handler.event_type, handler.name)
@@ -1,19 +1,67 @@
-from django.db.models import ManyToOneRel
-from django.forms import model_to_dict
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.db import DatabaseError, connections, router
+from django.db.models import DEFERRED, ManyToOneRel
+from django.db.models.signals import class_prepared
+from django.dispatch import receiver
 
 from event_actions.constants import FK_CHANGE
 from . import constants
+from .budgets import query_budget
+from .decorators import InnerEventDecorator
+from .digests import Digest, digest_text, get_digest_function
+from .exceptions import FKChangeLimitExceeded
+from .m2m import install_m2m_descriptors
+from .outbox.records import collect_outbox_records
+from .transactions import coalesce_event
+
+logger = logging.getLogger(__name__)
+
+# The types of the values which can be changed in place
+MUTABLE_TYPES = (dict, list, set, bytearray)
 
 
 class ModelChangesMixin(object):
     """
     This class tracks the changed fields while the save() method of the model is called.
+
+    The initial state is kept as a tuple of raw attribute values ordered like the model's
+    concrete fields and is only compared against the current state when the diff is requested.
+
+    If 'track_dirty_fields' is True, assigning a field marks it as dirty and only the dirty fields
+    are compared. Changes that don't assign the field (e.g. mutating a dict in place) are not
+    detected in this mode.
+
+    'track_fields' is the list of the fields compared in the diff, or '__all__'. By default all
+    of the fields are compared.
+
+    The fields in 'digest_fields', or all of the text, JSON and binary fields if it's '__large__',
+    are kept in the snapshot as Digests of their values, which are also their previous values
+    in the diff. The fields watched by a handler with 'prev' keep their values.
     """
 
+    track_dirty_fields = False
+    track_fields = None
+    digest_fields = ()
+    _digest_functions = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        self._initial_values = self._current_values()
+        if self.track_dirty_fields:
+            # The fields set while initializing the instance are not dirty
+            self._dirty_fields = set()
+
+        concrete_fields = self._meta.concrete_fields
+        if not kwargs and len(args) == len(concrete_fields):
+            # Model.from_db() instantiates the model with exactly one positional value per
+            # concrete field (DEFERRED for the deferred ones), so the values are the snapshot.
+            self._initial_values = self._digest_values(args) if self._digest_functions else args
+        else:
+            self._initial_values = self._digest_values(self._get_snapshot())
 
     @property
     def changed_fields(self):
@@ -29,15 +77,7 @@ class ModelChangesMixin(object):
         :return: A dictionary in the format:
                      {'changed_field_1': ('prev_value', 'new_value'), 'changed_field_2' ... }
         """
-        initial_values = self._initial_values
-        current_values = self._current_values()
-
-        diffs = {}
-        for key, value in initial_values.items():
-            if value != current_values[key]:
-                diffs[key] = (value, current_values[key])
-
-        return diffs
+        return self._get_diff(self._initial_values, self._get_dirty_fields())
 
     def get_field_diff(self, field_name):
         """
@@ -59,110 +99,844 @@ class ModelChangesMixin(object):
 
     def save(self, *args, **kwargs):
         """
-        Call model's default save method and set the __initial state
+        Call model's default save method and set the __initial state of the saved fields
         """
         super().save(*args, **kwargs)
-        self._initial_values = self._current_values()
+        self._reset_changes(kwargs.get('update_fields'))
 
-    def _current_values(self):
-        return model_to_dict(
-            self, fields=[field.name for field in self._meta.fields]
-        )
+    def refresh_from_db(self, using=None, fields=None):
+        """
+        Reload the fields from the database and take their values as the initial state.
+
+        The deferred fields are loaded by this method too, so they are not seen as changed.
+        """
+        super().refresh_from_db(using=using, fields=fields)
+        self._reset_changes(fields)
+
+    def _reset_changes(self, field_names=None):
+        """
+        Take the current values as the initial state, only for the given field names if passed.
+        """
+        if field_names is None:
+            self._initial_values = self._digest_values(self._get_snapshot())
+            if self.track_dirty_fields:
+                self._dirty_fields = set()
+            return
+
+        field_names = set(field_names)
+        values = self.__dict__
+        initial_values = list(self._initial_values)
+        reset_fields = set()
+        for index, field in enumerate(self._meta.concrete_fields):
+            if field.name in field_names or field.attname in field_names:
+                initial_values[index] = values.get(field.attname, DEFERRED)
+                reset_fields.add(field.name)
+
+        self._initial_values = self._digest_values(initial_values)
+        if self.track_dirty_fields:
+            # A new set, the DiffCache of a save may still refer to the old one
+            self._dirty_fields = self._dirty_fields - reset_fields
+
+    def _get_snapshot(self):
+        """
+        Return the raw values of the concrete fields without touching the deferred ones.
+        """
+        values = self.__dict__
+        return tuple(values.get(field.attname, DEFERRED) for field in self._meta.concrete_fields)
+
+    def _digest_values(self, values):
+        """
+        Replace the values of the digest fields in the snapshot with their Digests.
+        """
+        if not self._digest_functions:
+            return tuple(values)
+
+        values = list(values)
+        for index, digest_function in self._digest_functions:
+            value = values[index]
+            if value is not DEFERRED and not isinstance(value, Digest):
+                values[index] = Digest(value, digest_function)
+        return tuple(values)
+
+    def _get_dirty_fields(self):
+        """
+        Return the names of the assigned fields or None if the dirty fields are not tracked.
+        """
+        return self.__dict__.get('_dirty_fields')
+
+    def _get_diff(self, initial_values, dirty_fields=None, all_fields=False, update_fields=None):
+        """
+        Compare the given snapshot with the current values and return the diff.
+
+        Only the tracked fields are compared unless all_fields is True,
+        if dirty_fields or update_fields are given only those fields are compared.
+        """
+        current_values = self.__dict__
+        concrete_fields = self._meta.concrete_fields
+        positions = None if all_fields else self._get_tracked_positions()
+
+        if dirty_fields is not None:
+            dirty_field_positions = self._dirty_field_positions
+            dirty_positions = sorted(dirty_field_positions[name] for name in dirty_fields)
+            if positions is not None:
+                dirty_positions = [index for index in dirty_positions if index in positions]
+            positions = dirty_positions
+
+        if update_fields is not None:
+            update_positions = self._get_field_positions(update_fields)
+            if positions is None:
+                positions = sorted(update_positions)
+            else:
+                positions = [index for index in positions if index in update_positions]
+
+        if positions is None:
+            fields_and_values = zip(concrete_fields, initial_values)
+        else:
+            fields_and_values = ((concrete_fields[index], initial_values[index]) for index in positions)
+
+        diffs = {}
+        for field, value in fields_and_values:
+            if not field.editable:
+                continue
+
+            # A deferred field is unknown until it's loaded or assigned, loading it resets the snapshot
+            # of the field, so a deferred initial value with a current one means that it's assigned.
+            current_value = current_values.get(field.attname, DEFERRED)
+            if current_value is not DEFERRED and (value is DEFERRED or value != current_value):
+                diffs[field.name] = (value, current_value)
+
+        return diffs
+
+    def _get_changed_field_names(self, initial_values, dirty_fields=None):
+        """
+        Return the names of the fields to write to save the changes since the snapshot.
+
+        Unlike the diff, all of the fields are compared, including the ones which are not editable.
+        The fields set on every save (auto_now) and the mutable values (e.g. the dicts and lists of
+        the JSON fields) which are not kept as digests are always written, as the snapshot refers
+        to the same objects and their changes in place can't be detected.
+        """
+        current_values = self.__dict__
+        field_names = []
+        for field, value in zip(self._meta.concrete_fields, initial_values):
+            current_value = current_values.get(field.attname, DEFERRED)
+            if field.primary_key or current_value is DEFERRED:
+                continue
+
+            if getattr(field, 'auto_now', False) or (
+                isinstance(current_value, MUTABLE_TYPES) and not isinstance(value, Digest)
+            ):
+                field_names.append(field.name)
+            # The fields which are not editable are not marked as dirty
+            elif dirty_fields is not None and field.editable and field.name not in dirty_fields:
+                continue
+            elif value is DEFERRED or value != current_value:
+                field_names.append(field.name)
+
+        return field_names
+
+    @classmethod
+    def _get_field_positions(cls, field_names):
+        """
+        Return the positions of the given fields in the snapshot, the fields may be passed by their attnames.
+        """
+        positions = cls.__dict__.get('_field_positions_cache')
+        if positions is None:
+            positions = {}
+            for index, field in enumerate(cls._meta.concrete_fields):
+                positions[field.name] = positions[field.attname] = index
+            if apps.ready:
+                cls._field_positions_cache = positions
+
+        return frozenset(positions[name] for name in field_names if name in positions)
+
+    @classmethod
+    def _get_tracked_positions(cls):
+        """
+        Return the sorted positions of the tracked fields in the snapshot, None if all of the fields are tracked.
+        """
+        # The tracked fields depend on the FK relations, which are invalidated with _meta.related_objects
+        related_objects = cls._meta.related_objects
+        cache = cls.__dict__.get('_tracked_positions_cache')
+        if cache is not None and cache[0] is related_objects:
+            return cache[1]
+
+        field_names = cls._get_tracked_field_names()
+        positions = None
+        if field_names is not None:
+            positions = tuple(
+                index for index, field in enumerate(cls._meta.concrete_fields)
+                if field.name in field_names or field.attname in field_names
+            )
+
+        # The tracked fields may depend on the relations which are resolved when the apps are ready
+        if apps.ready:
+            cls._tracked_positions_cache = (related_objects, positions)
+        return positions
+
+    @classmethod
+    def _get_tracked_field_names(cls):
+        """
+        Return the names of the tracked fields, None if all of the fields are tracked.
+        """
+        if cls.track_fields is None or cls.track_fields == constants.ALL_FIELDS:
+            return None
+        return set(cls.track_fields)
+
+
+class DiffCache:
+    """
+    Memoize the diff of an instance while the handlers of an event are called.
+
+    The diff is computed when the first handler needs it and is only computed again
+    if a called handler has changed the instance.
+    """
+
+    def __init__(self, instance, initial_values=None, dirty_fields=None, update_fields=None):
+        self.instance = instance
+        if initial_values is None:
+            initial_values = instance._initial_values
+            dirty_fields = instance._get_dirty_fields()
+        self.initial_values = initial_values
+        self.dirty_fields = dirty_fields
+        # The fields passed to save(update_fields=...), the other fields are not saved
+        self.update_fields = update_fields
+        self._values = None
+        self._diff = None
+
+    @property
+    def diff(self):
+        if self._diff is None:
+            self._values = self.instance._get_snapshot()
+            self._diff = self.instance._get_diff(
+                self.initial_values, self.dirty_fields, update_fields=self.update_fields,
+            )
+        return self._diff
+
+    def handler_called(self):
+        """
+        Drop the memoized diff if the handler that was just called has changed the instance.
+        """
+        if self._diff is not None and self.instance._get_snapshot() != self._values:
+            self._diff = None
+
+
+class DirtyFieldDescriptor:
+    """
+    Wrap the descriptor of a field to mark the field as dirty when it's assigned.
+    """
+
+    def __init__(self, field, descriptor):
+        self.field = field
+        self.descriptor = descriptor
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        return self.descriptor.__get__(instance, cls)
+
+    def __set__(self, instance, value):
+        dirty_fields = instance.__dict__.get('_dirty_fields')
+        if dirty_fields is not None:
+            dirty_fields.add(self.field.name)
+
+        if hasattr(self.descriptor, '__set__'):
+            self.descriptor.__set__(instance, value)
+        else:
+            instance.__dict__[self.field.attname] = value
+
+
+@receiver(class_prepared)
+def install_dirty_field_descriptors(sender, **kwargs):
+    """
+    Wrap the field descriptors of the models that track the dirty fields.
+    """
+    if not (issubclass(sender, ModelChangesMixin) and sender.track_dirty_fields):
+        return
+
+    positions = {}
+    for index, field in enumerate(sender._meta.concrete_fields):
+        if not field.editable:
+            continue
+        positions[field.name] = index
+
+        descriptor = getattr(sender, field.attname)
+        if isinstance(descriptor, DirtyFieldDescriptor):
+            descriptor = descriptor.descriptor
+        setattr(sender, field.attname, DirtyFieldDescriptor(field, descriptor))
+
+    sender._dirty_field_positions = positions
+
+
+class FixedDiffCache(DiffCache):
+    """
+    A DiffCache with a precomputed diff, e.g. the net diff of the coalesced saves.
+    """
+
+    def __init__(self, instance, diff):
+        super().__init__(instance)
+        self._diff = diff
+
+    def handler_called(self):
+        pass
+
+
+class HandlerBatch:
+    """
+    Collect the instances that triggered the batch handlers of an event to call each handler once.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.calls = {}
+
+    def add(self, handler, instance, diff, diff_cache):
+        instances, diffs, diff_caches = self.calls.setdefault(handler, ([], [], []))
+        instances.append(instance)
+        diffs.append(diff)
+        diff_caches.append(diff_cache)
+
+    def call_handlers(self):
+        """
+        Call the collected batch handlers and clear the batch.
+        """
+        calls, self.calls = self.calls, {}
+        for handler, (instances, diffs, diff_caches) in calls.items():
+            handler.call_batch(self.model, instances, diffs)
+            for diff_cache in diff_caches:
+                if diff_cache is not None:
+                    diff_cache.handler_called()
+
+
+class EventHandlerIndex:
+    """
+    Index the handlers of an event by the field they watch.
+
+    A handler with a 'field' or 'fields' argument can only trigger when that field is changed,
+    so only the handlers watching the changed fields and the ones without a field are checked.
+    """
+
+    def __init__(self, handlers):
+        self.unconditional = []
+        self.field_index = {}
+
+        for position, handler in enumerate(handlers):
+            if handler.watched_field is None:
+                self.unconditional.append(position)
+            else:
+                self.field_index.setdefault(handler.watched_field, []).append(position)
+
+    def get_positions(self, diff, changed_related_field=None, start=0):
+        """
+        Return the sorted positions of the handlers to check for the given changes.
+        """
+        positions = set(self.unconditional)
+        for field_name in diff:
+            positions.update(self.field_index.get(field_name, ()))
+        if changed_related_field:
+            positions.update(self.field_index.get(changed_related_field, ()))
+
+        return sorted(position for position in positions if position >= start)
 
 
 class EventActionMixin:
     """
     A class to call the event decorator and their handler functions.
     This class uses ModelChangesMixin to track the changes in the models.
+
+    The handlers are collected once when the model class is prepared into '_event_handlers'
+    in the format of {'event_name': (handler_1, handler_2, ...), } keeping the definition order
+    and indexed by the fields they watch in '_event_handler_indexes'.
+
+    The objects pointed by the foreign keys of the model notify this model's objects in chunks.
+    The notification of each foreign key can be configured in 'fk_change_options':
+    {'fk_field_name': {'chunk_size': 2000, 'limit': None, 'on_limit': 'raise', 'only': None}, }
+    where 'on_limit' is 'raise', 'skip' or a callable which gets the saved object, the
+    foreign key field and a queryset of the objects that are not notified, and 'only' is the
+    list of the fields to load with the objects, all of them if it's None.
+
+    If 'post_actions_on_commit' is True, the post event handlers are called when the transaction
+    is committed unless the decorator sets on_commit=False.
+
+    If 'coalesce_post_actions' is True, the post create and save handlers are called once per
+    transaction with the net diff of the saves unless the decorator sets coalesce=False.
+
+    The handlers can be async functions, they are awaited in the event loop by asave() and adelete()
+    and called with async_to_sync by save() and delete(). The async handlers which are deferred
+    to the commit of the transaction are always called with async_to_sync.
+
+    If the model has outbox handlers for an event, the save or delete and the outbox events
+    are written in one transaction.
+
+    The diff of a save with 'update_fields' only has the updated fields. If 'save_changed_fields_only'
+    is True, the save of an existing object without 'update_fields' only writes the changed fields.
     """
 
+    fk_change_options = {}
+    post_actions_on_commit = False
+    coalesce_post_actions = False
+    save_changed_fields_only = False
+    _coalesced_events = frozenset()
+    _outbox_events = frozenset()
+
+    _event_handlers = {}
+    _event_handler_indexes = {}
+    _event_async_handlers = {}
+
     def save(self, *args, **kwargs):
         """
         Replace model's default save method and call the appropriate actions.
         """
-        new_instance = self._state.adding
+        instance, _ = self._save_and_call_actions(args, kwargs)
+        return instance
 
-        if new_instance:
-            self._call_actions(constants.PRE_CREATE)
-        else:
-            self._call_actions(constants.PRE_SAVE)
+    def delete(self, *args, **kwargs):
+        """
+        Replace model's default delete method and call the appropriate actions.
+        """
+        return self._delete_and_call_actions(args, kwargs)
+
+    async def asave(self, *args, **kwargs):
+        """
+        Save the instance from async code and await the async handlers in the event loop.
 
-        instance = super().save(*args, **kwargs)
+        The async pre handlers are awaited before the sync ones and the async post handlers
+        after the sync ones, the sync handlers and the save itself run in a single thread.
+        """
+        pre_event, post_event = constants.PRE_SAVE, constants.POST_SAVE
+        if self._state.adding:
+            pre_event, post_event = constants.PRE_CREATE, constants.POST_CREATE
 
-        if new_instance:
-            self._call_actions(constants.POST_CREATE)
-        else:
-            self._call_actions(constants.POST_SAVE)
+        if not self._has_async_handlers(pre_event, post_event):
+            return await sync_to_async(self.save)(*args, **kwargs)
 
-        self._call_related_objs()
+        await self._acall_actions(pre_event, diff_cache=DiffCache(self, update_fields=kwargs.get('update_fields')))
+        instance, diff_cache = await sync_to_async(self._save_and_call_actions)(
+            args, kwargs, handlers=constants.SYNC_HANDLERS,
+        )
+        await self._acall_actions(post_event, diff_cache=diff_cache)
 
         return instance
 
-    def delete(self, *args, **kwargs):
+    async def adelete(self, *args, **kwargs):
         """
-        Replace model's default delete method and call the appropriate actions.
+        Delete the instance from async code and await the async handlers in the event loop.
+        """
+        if not self._has_async_handlers(constants.PRE_DELETE, constants.POST_DELETE):
+            return await sync_to_async(self.delete)(*args, **kwargs)
+
+        await self._acall_actions(constants.PRE_DELETE)
+        ret = await sync_to_async(self._delete_and_call_actions)(
+            args, kwargs, handlers=constants.SYNC_HANDLERS,
+        )
+        await self._acall_actions(constants.POST_DELETE)
+
+        return ret
+
+    def _save_and_call_actions(self, args, kwargs, handlers=None):
         """
-        self._call_actions(constants.PRE_DELETE)
+        Save the instance and call the actions, return the result of the save and the DiffCache of the post actions.
+        """
+        new_instance = self._state.adding
+        initial_values = self._initial_values
+        dirty_fields = self._get_dirty_fields()
 
-        ret = super().delete(*args, **kwargs)
+        pre_event, post_event = constants.PRE_SAVE, constants.POST_SAVE
+        if new_instance:
+            pre_event, post_event = constants.PRE_CREATE, constants.POST_CREATE
+
+        model = self.__class__
+        using = kwargs.get('using') or router.db_for_write(model, instance=self)
+        update_fields = kwargs.get('update_fields')
+        with collect_outbox_records(model, using, (post_event,)):
+            with query_budget(model, pre_event, using):
+                self._call_actions(pre_event, diff_cache=DiffCache(self, update_fields=update_fields), _handlers=handlers)
+
+            if update_fields is None and self._saves_changed_fields_only(new_instance, args, kwargs):
+                # The changes made by the pre handlers are saved too
+                changed_fields = self._get_changed_field_names(initial_values, dirty_fields)
+                instance, update_fields = self._save_changed_fields(kwargs, changed_fields, using)
+            else:
+                instance = super().save(*args, **kwargs)
+
+            # The snapshot is reset by the save, the post actions are checked against the saved changes
+            diff_cache = DiffCache(self, initial_values, dirty_fields, update_fields=update_fields)
+            # The fan-out to the related objects is in the query budget of the post event
+            with query_budget(model, post_event, using):
+                self._call_post_actions(post_event, diff_cache, handlers=handlers)
+                self._call_related_objs(diff_cache)
+
+        return instance, diff_cache
+
+    def _saves_changed_fields_only(self, new_instance, args, kwargs):
+        """
+        Return True if the save should only write the changed fields.
+        """
+        # The save options may be passed positionally: force_insert, force_update, using, update_fields
+        return (
+            self.save_changed_fields_only
+            and not new_instance
+            and not args
+            and not kwargs.get('force_insert')
+        )
+
+    def _save_changed_fields(self, kwargs, field_names, using):
+        """
+        Save only the given fields, or the whole object if its row doesn't exist anymore.
+
+        Return the result of the save and the saved fields, None if all of the fields are saved.
+        """
+        kwargs.pop('update_fields', None)
+        connection = connections[using]
+        needs_rollback = connection.needs_rollback
+        try:
+            return super().save(update_fields=field_names, **kwargs), field_names
+        except DatabaseError as error:
+            # Django raises a plain DatabaseError if the update didn't match a row,
+            # the errors of the database are its subclasses or are raised from the driver's errors
+            if type(error) is not DatabaseError or error.__cause__ is not None:
+                raise
+            # No query has failed, so the transaction which is marked for rollback by the save is usable
+            connection.needs_rollback = needs_rollback
+
+        return super().save(**kwargs), None
+
+    def _delete_and_call_actions(self, args, kwargs, handlers=None):
+        """
+        Delete the instance and call the actions.
+        """
+        model = self.__class__
+        using = kwargs.get('using') or router.db_for_write(model, instance=self)
+        with collect_outbox_records(model, using, (constants.POST_DELETE,)):
+            with query_budget(model, constants.PRE_DELETE, using):
+                self._call_actions(constants.PRE_DELETE, _handlers=handlers)
 
-        self._call_actions(constants.POST_DELETE)
+            # The primary key of the deleted instance is set to None, the outbox events need it
+            pk = self.pk
+            ret = super().delete(*args, **kwargs)
+
+            with query_budget(model, constants.POST_DELETE, using):
+                self._call_actions(constants.POST_DELETE, _handlers=handlers, _pk=pk)
 
         return ret
 
-    def _call_related_objs(self):
+    def _call_related_objs(self, diff_cache):
         """
         If the object's field's values are changed, inform the objects that have related (FK or M2M)
         reference to this object.
+
+        Only the relations that would trigger a FK_CHANGE handler are queried and only the columns
+        needed to check the handlers are loaded.
         """
-        fk_relations = self._get_reverse_fields()
+        fk_relations = self._get_fk_change_relations()
+        if not fk_relations or not diff_cache.diff:
+            return
 
         for fk in fk_relations:
-            related_objs = fk.related_model.objects.filter(**{fk.remote_field.name: self.id})
-            for obj in related_objs:
-                obj._fk_changed(fk.remote_field.name)
+            self._call_related_fk_objs(fk)
 
-    def _get_reverse_fields(self):
+    def _call_related_fk_objs(self, fk):
+        """
+        Stream the objects that point to this object with the given foreign key and notify them.
+        """
+        field = fk.field
+        pk_name = fk.related_model._meta.pk.name
+        options = fk.related_model._get_fk_change_options(field.name)
+        limit = options['limit']
+
+        related_objs = fk.related_model._default_manager.filter(
+            **{field.attname: getattr(self, field.target_field.attname)}
+        ).order_by(pk_name)
+        if options['only'] is not None:
+            # The other fields are loaded by a query per object if the handlers access them
+            related_objs = related_objs.only(pk_name, field.name, *options['only'])
+
+        for count, obj in enumerate(related_objs.iterator(chunk_size=options['chunk_size'])):
+            if limit is not None and count >= limit:
+                remaining_objs = related_objs.filter(**{f'{pk_name}__gte': obj.pk})
+                self._fk_change_limit_reached(field, options['on_limit'], remaining_objs)
+                return
+
+            obj._fk_changed(field.name)
+
+    def _fk_change_limit_reached(self, field, on_limit, remaining_objs):
         """
-        Return the fields from other models that have FK reference to the current model.
+        Handle the objects that exceed the FK change limit of the foreign key.
         """
-        fields = self._meta.get_fields()
-        fk_relations = [f for f in fields if isinstance(f, ManyToOneRel)]
+        if callable(on_limit):
+            on_limit(self, field, remaining_objs)
+        elif on_limit == constants.FK_CHANGE_SKIP:
+            logger.warning(
+                'FK change limit of %s is reached, the remaining objects pointing to %r are not notified.',
+                field, self
+            )
+        else:
+            raise FKChangeLimitExceeded(f'Too many objects are pointing to {self!r} with {field}.')
+
+    @classmethod
+    def _get_fk_change_relations(cls):
+        """
+        Return the FK relations to the model which can trigger a FK_CHANGE handler of the related model.
+
+        The relations are cached on the model once the apps are ready. Django recomputes
+        _meta.related_objects when the models cache is cleared (e.g. a model is registered),
+        which also invalidates this cache.
+        """
+        related_objects = cls._meta.related_objects
+        cache = cls.__dict__.get('_fk_change_relations_cache')
+        if cache is not None and cache[0] is related_objects:
+            return cache[1]
+
+        fk_relations = tuple(
+            fk for fk in related_objects
+            if isinstance(fk, ManyToOneRel)
+            and issubclass(fk.related_model, EventActionMixin)
+            and fk.related_model._watches_fk(fk.field.name)
+        )
+
+        if apps.ready:
+            cls._fk_change_relations_cache = (related_objects, fk_relations)
         return fk_relations
 
+    def _call_actions(self, event_type, *args, diff_cache=None, **kwargs):
+        """
+        Call the handler functions bound to 'event_type'.
+
+        All of the handlers share the same DiffCache, so the diff is computed once per event.
+        """
+        handlers = self._event_handlers.get(event_type)
+        if not handlers:
+            return
+
+        if diff_cache is None:
+            diff_cache = DiffCache(self)
+
+        index = self._event_handler_indexes[event_type]
+        if not index.field_index:
+            for handler in handlers:
+                handler(self, *args, _diff_cache=diff_cache, **kwargs)
+            return
+
+        changed_related_field = kwargs.get('_change_related')
+        diff = diff_cache.diff
+        positions = index.get_positions(diff, changed_related_field)
+
+        i = 0
+        while i < len(positions):
+            position = positions[i]
+            handlers[position](self, *args, _diff_cache=diff_cache, **kwargs)
+            i += 1
+
+            if diff_cache.diff is not diff:
+                # The handler has changed the instance, other handlers may watch the new changes
+                diff = diff_cache.diff
+                positions = index.get_positions(diff, changed_related_field, start=position + 1)
+                i = 0
+
+    async def _acall_actions(self, event_type, diff_cache=None):
+        """
+        Await the async handler functions bound to 'event_type' concurrently.
+        """
+        handlers = self._event_async_handlers.get(event_type)
+        if not handlers:
+            return
+
+        if diff_cache is None:
+            diff_cache = DiffCache(self)
+
+        awaitables = [
+            handler(self, _diff_cache=diff_cache, _handlers=constants.ASYNC_HANDLERS) for handler in handlers
+        ]
+        await asyncio.gather(*(awaitable for awaitable in awaitables if awaitable is not None))
+
     @classmethod
-    def _get_action_functions_name(cls, event_type):
+    def _has_async_handlers(cls, *event_types):
         """
-        Return the name of the functions bound to certain events.
+        Return True if any of the events has handlers to await in the event loop.
         """
-        actions = cls.event_types.get(event_type, [])
-        return actions
+        return any(event_type in cls._event_async_handlers for event_type in event_types)
 
-    def _get_callable_functions(self, function_names):
+    @classmethod
+    def _get_tracked_field_names(cls):
         """
-        Get the function names and return their callables.
+        Return the names of the fields watched by the handlers and the fields in 'track_fields',
+        None if all of the fields are tracked.
+
+        All of the fields are tracked if the model doesn't have handlers and 'track_fields', if a
+        handler receives or stores the whole diff, if a handler which doesn't watch a field uses
+        the diff or if the model notifies related objects.
         """
-        callable_functions = [getattr(self, func_name) for func_name in function_names]
-        return callable_functions
+        if cls.track_fields == constants.ALL_FIELDS:
+            return None
+        if not cls._event_handlers and cls.track_fields is None:
+            return None
+
+        field_names = set(cls.track_fields or ())
+        for handlers in cls._event_handlers.values():
+            for handler in handlers:
+                if handler.accepts_diff or handler.outbox:
+                    return None
+                if handler.fields:
+                    field_names.update(handler.fields)
+                elif handler.field is not None:
+                    field_names.add(handler.field)
+                elif handler.uses_diff:
+                    return None
+
+        # Any change of the object is a change of the foreign key for the related objects
+        if cls._get_fk_change_relations():
+            return None
+        return field_names
 
-    def _call_function(self, function, *args, **kwargs):
+    @classmethod
+    def _watches_fk(cls, field_name):
         """
-        Call the function with given args and kwargs.
+        Return True if a FK_CHANGE handler can trigger when the object pointed by the field is changed.
         """
-        return function(*args, **kwargs)
+        index = cls._event_handler_indexes.get(FK_CHANGE)
+        return index is not None and bool(index.get_positions({}, field_name))
 
-    def _call_actions(self, event_type, *args, **kwargs):
+    @classmethod
+    def _get_fk_change_options(cls, field_name):
         """
-        Call the handler functions bound to 'event_type'.
+        Return the options for notifying this model's objects of the change of the foreign key.
         """
-        function_names = self.__class__._get_action_functions_name(event_type)
-        functions = self._get_callable_functions(function_names)
+        options = {
+            'chunk_size': constants.FK_CHANGE_CHUNK_SIZE,
+            'limit': None,
+            'on_limit': constants.FK_CHANGE_RAISE,
+            'only': None,
+        }
+        options.update(cls.fk_change_options.get(field_name, {}))
+        return options
+
+    def _call_post_actions(self, event_type, diff_cache, batch=None, handlers=None):
+        """
+        Call the post create or save handlers and add the changes to the coalesced event if needed.
+        """
+        self._call_actions(event_type, diff_cache=diff_cache, _batch=batch, _handlers=handlers)
 
-        for func in functions:
-            self._call_function(func, self, *args, **kwargs)
+        if event_type in self._coalesced_events:
+            coalesce_event(self, event_type, diff_cache.diff)
+
+    def _call_coalesced_actions(self, event_type, diff):
+        """
+        Call the coalesced handlers with the net diff of the saves in the transaction.
+        """
+        self._call_actions(event_type, diff_cache=FixedDiffCache(self, diff), _coalesced=True)
+
+    @classmethod
+    def _watches_m2m(cls, field_name):
+        """
+        Return True if a M2M_CHANGE handler can trigger when the many-to-many field is changed.
+        """
+        index = cls._event_handler_indexes.get(constants.M2M_CHANGE)
+        return index is not None and bool(index.get_positions({field_name: None}))
+
+    @classmethod
+    def _get_m2m_field_name(cls, through):
+        """
+        Return the name of the many-to-many field of the model which uses the 'through' model.
+        """
+        for field in cls._meta.many_to_many:
+            if field.remote_field.through is through:
+                return field.name
+        return None
+
+    def _m2m_changed(self, field_name, change):
+        """
+        Call the actions for M2M_CHANGE with the M2MChange of the field as the diff.
+        """
+        self._call_actions(constants.M2M_CHANGE, diff_cache=FixedDiffCache(self, {field_name: change}))
 
     def _fk_changed(self, changed_field):
         """
         Call the actions for FK_CHANGE
         """
         self._call_actions(FK_CHANGE, _change_related=changed_field)
+
+
+@receiver(class_prepared)
+def prepare_event_handlers(sender, **kwargs):
+    """
+    Build the event dispatch table of the EventActionMixin subclasses.
+    """
+    if not issubclass(sender, EventActionMixin):
+        return
+
+    install_m2m_descriptors(sender)
+
+    # Walk the MRO from the base classes so the overridden handlers are replaced
+    handlers = {}
+    for klass in reversed(sender.__mro__):
+        for name, value in vars(klass).items():
+            if isinstance(value, InnerEventDecorator):
+                handlers[name] = value
+            elif name in handlers:
+                del handlers[name]
+
+    event_handlers = {}
+    for handler in handlers.values():
+        event_handlers.setdefault(handler.event_type, []).append(handler)
+
+    sender._event_handlers = {event_type: tuple(handler_list) for event_type, handler_list in event_handlers.items()}
+    sender._event_handler_indexes = {
+        event_type: EventHandlerIndex(handler_list) for event_type, handler_list in event_handlers.items()
+    }
+    sender._event_async_handlers = {
+        event_type: async_handlers for event_type, async_handlers in (
+            (event_type, tuple(handler for handler in handler_list if handler.is_awaited(sender)))
+            for event_type, handler_list in event_handlers.items()
+        ) if async_handlers
+    }
+    sender._outbox_events = frozenset(
+        event_type for event_type, handler_list in event_handlers.items()
+        if any(handler.outbox for handler in handler_list)
+    )
+    sender._coalesced_events = frozenset(
+        event_type for event_type, handler_list in event_handlers.items()
+        if any(handler.is_coalesced(sender) for handler in handler_list)
+    )
+
+
+@receiver(class_prepared)
+def prepare_digest_fields(sender, **kwargs):
+    """
+    Find the positions and the digest functions of the digest fields in the snapshot.
+
+    It's connected after prepare_event_handlers, so the handlers of the model are collected.
+    """
+    if not (issubclass(sender, ModelChangesMixin) and sender.digest_fields):
+        return
+
+    # The handlers which compare the previous value need the value itself
+    prev_fields = {
+        handler.field
+        for handlers in getattr(sender, '_event_handlers', {}).values()
+        for handler in handlers if handler.prev is not None
+    }
+
+    digest_functions = []
+    for index, field in enumerate(sender._meta.concrete_fields):
+        if field.name in prev_fields:
+            continue
+        digest_function = get_digest_function(field)
+        if sender.digest_fields == constants.LARGE_FIELDS:
+            if digest_function is not None:
+                digest_functions.append((index, digest_function))
+        elif field.name in sender.digest_fields:
+            digest_functions.append((index, digest_function or digest_text))
+
+    sender._digest_functions = tuple(digest_functions)
+
+
+def clear_relations_cache():
+    """
+    Clear the cached FK relations and tracked fields of all models, e.g. after changing the handlers
+    of a model in tests.
+    """
+    for model in apps.get_models(include_auto_created=True):
+        if '_fk_change_relations_cache' in model.__dict__:
+            del model._fk_change_relations_cache
+        if '_tracked_positions_cache' in model.__dict__:
+            del model._tracked_positions_cache
@@ -1,5 +1,6 @@
 from django.db import models
 
+from .managers import EventActionManager
 from .mixins import ModelChangesMixin, EventActionMixin
 
 
@@ -13,5 +14,7 @@ class EventActionModel(EventActionMixin, ModelChangesMixin, models.Model):
 
     event_types = {}
 
+    objects = EventActionManager()
+
     class Meta:
         abstract = True
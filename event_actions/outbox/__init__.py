@@ -0,0 +1,7 @@
+"""
+A durable outbox for the event handlers.
+
+The handlers decorated with outbox=True are not called when the event is dispatched, an OutboxEvent
+is written in the same transaction as the save and the drain_outbox command calls the handlers later.
+Add 'event_actions.outbox' to the INSTALLED_APPS to use it.
+"""
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class OutboxConfig(AppConfig):
+    name = 'event_actions.outbox'
+    label = 'event_actions_outbox'
+    verbose_name = 'Event actions outbox'
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from event_actions import constants
+from event_actions.outbox.worker import drain_outbox
+
+
+class Command(BaseCommand):
+    help = 'Call the handlers of the outbox events in batches, several workers can run together.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=constants.OUTBOX_BATCH_SIZE)
+        parser.add_argument('--max-attempts', type=int, default=constants.OUTBOX_MAX_ATTEMPTS)
+        parser.add_argument(
+            '--retry-delay', type=float, default=constants.OUTBOX_RETRY_DELAY,
+            help='Seconds to wait before retrying a failed event, doubled after each attempt.',
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            '--sleep', type=float, default=1.0, help='Seconds to wait when no event could be called.',
+        )
+        parser.add_argument(
+            '--once', action='store_true', help='Exit when no event could be called instead of waiting for new events.',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        try:
+            while True:
+                count = drain_outbox(
+                    options['batch_size'], options['database'], options['max_attempts'], options['retry_delay'],
+                )
+                total += count
+                if count:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(f'Drained {total} outbox events.')
@@ -0,0 +1,25 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class OutboxEvent(models.Model):
+    """
+    An event whose outbox handler is not called yet.
+
+    The 'diff' is stored in the format of {'field_name': [prev_value, new_value], }
+    A failed event is not retried before 'next_attempt_at'.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=255)
+    object_pk = models.CharField(max_length=255)
+    event_type = models.CharField(max_length=32)
+    handler = models.CharField(max_length=255)
+    diff = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.event_type} {self.model}({self.object_pk}).{self.handler}'
@@ -0,0 +1,88 @@
+"""Writing the outbox events in the transaction of the save"""
+from contextlib import contextmanager
+
+from asgiref.local import Local
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import DEFERRED
+
+from ..digests import Digest
+
+# The OutboxEvents of the running save or bulk operation, flushed with a bulk insert
+_buffer = Local()
+
+
+def get_outbox_model():
+    try:
+        return apps.get_model('event_actions_outbox', 'OutboxEvent')
+    except LookupError:
+        raise ImproperlyConfigured(
+            "The outbox handlers need 'event_actions.outbox' in the INSTALLED_APPS"
+        ) from None
+
+
+@contextmanager
+def collect_outbox_records(model, using, event_types):
+    """
+    Collect the outbox events written in the block and insert them in bulk at the end of it.
+
+    If the model has outbox handlers for the event types, the block is run in a transaction,
+    so the outbox events are committed with the changes of the block.
+    """
+    if not model._outbox_events.intersection(event_types) or getattr(_buffer, 'records', None) is not None:
+        yield
+        return
+
+    with transaction.atomic(using=using, savepoint=False):
+        _buffer.records = []
+        try:
+            yield
+            records = _buffer.records
+        finally:
+            _buffer.records = None
+        _insert_records(records)
+
+
+def add_outbox_record(instance, handler, diff, pk=None):
+    """
+    Add an OutboxEvent for calling the handler of the instance later.
+
+    The 'pk' is passed for the deleted instances whose primary key is set to None.
+    """
+    if pk is None:
+        pk = instance.pk
+    if pk is None:
+        # The record could never be drained
+        raise ValueError(f"Can't write an outbox event of {instance._meta.label} object without a primary key.")
+
+    record = get_outbox_model()(
+        model=instance._meta.label_lower,
+        object_pk=str(pk),
+        event_type=handler.event_type,
+        handler=handler.name,
+        diff={field_name: [_to_json(value) for value in values] for field_name, values in (diff or {}).items()},
+    )
+
+    records = getattr(_buffer, 'records', None)
+    if records is None:
+        _insert_records([(instance._state.db, record)])
+    else:
+        records.append((instance._state.db, record))
+
+
+def _to_json(value):
+    # The previous values of the digest fields are stored as their hex digests,
+    # the unknown previous values of the deferred fields as None
+    if value is DEFERRED:
+        return None
+    return value.hexdigest() if isinstance(value, Digest) else value
+
+
+def _insert_records(records):
+    records_by_db = {}
+    for using, record in records:
+        records_by_db.setdefault(using, []).append(record)
+
+    for using, db_records in records_by_db.items():
+        get_outbox_model().objects.using(using).bulk_create(db_records)
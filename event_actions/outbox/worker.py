@@ -0,0 +1,81 @@
+"""Calling the handlers of the outbox events"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .. import constants
+from .records import get_outbox_model
+
+logger = logging.getLogger(__name__)
+
+
+def drain_outbox(batch_size=constants.OUTBOX_BATCH_SIZE, using=DEFAULT_DB_ALIAS,
+                 max_attempts=constants.OUTBOX_MAX_ATTEMPTS, retry_delay=constants.OUTBOX_RETRY_DELAY):
+    """
+    Call the handlers of a batch of outbox events and return the number of the called events.
+
+    The events are locked with SELECT ... FOR UPDATE SKIP LOCKED where the database supports it,
+    so several workers can drain the outbox together. The called events are deleted, the failed
+    ones are retried after 'retry_delay' seconds, doubled after each attempt, until they fail
+    'max_attempts' times.
+    """
+    outbox_model = get_outbox_model()
+    now = timezone.now()
+    queryset = outbox_model.objects.using(using).filter(
+        Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now),
+        attempts__lt=max_attempts,
+    ).order_by('pk')
+    if connections[using].features.has_select_for_update_skip_locked:
+        queryset = queryset.select_for_update(skip_locked=True)
+
+    with transaction.atomic(using=using):
+        events = list(queryset[:batch_size])
+
+        called_pks = []
+        failed_events = []
+        for event in events:
+            try:
+                # A failed handler doesn't roll back the changes of the other handlers in the batch
+                with transaction.atomic(using=using):
+                    call_outbox_event(event, using)
+            except Exception:
+                logger.exception('The outbox handler of %s failed', event)
+                event.attempts += 1
+                event.last_error = traceback.format_exc()
+                delay = min(retry_delay * 2 ** (event.attempts - 1), constants.OUTBOX_MAX_RETRY_DELAY)
+                event.next_attempt_at = now + timedelta(seconds=delay)
+                failed_events.append(event)
+            else:
+                called_pks.append(event.pk)
+
+        if called_pks:
+            outbox_model.objects.using(using).filter(pk__in=called_pks).delete()
+        if failed_events:
+            outbox_model.objects.using(using).bulk_update(
+                failed_events, ['attempts', 'last_error', 'next_attempt_at'],
+            )
+
+    return len(called_pks)
+
+
+def call_outbox_event(event, using=DEFAULT_DB_ALIAS):
+    """
+    Call the outbox handler of the event with the object and the diff.
+
+    If the object is deleted, the handler gets an unsaved instance with only the primary key.
+    """
+    model = apps.get_model(event.model)
+    handler = getattr(model, event.handler)
+
+    pk = model._meta.pk.to_python(event.object_pk)
+    instance = model._default_manager.using(using).filter(pk=pk).first()
+    if instance is None:
+        instance = model(pk=pk)
+
+    diff = {field_name: tuple(values) for field_name, values in event.diff.items()}
+    return handler.call_outbox(instance, diff)
@@ -0,0 +1,124 @@
+"""Finding the slow handlers"""
+import cProfile
+import itertools
+import logging
+import pstats
+import threading
+
+from . import instrumentation
+
+logger = logging.getLogger(__name__)
+
+# The duration in seconds above which a handler call is logged, None to disable it
+slow_handler_threshold = None
+# Every Nth handler call is profiled, None to disable the profiling
+profile_every = None
+
+_calls = itertools.count()
+_stats = None
+_stats_lock = threading.Lock()
+_profiling = threading.local()
+
+
+def set_slow_handler_threshold(milliseconds):
+    """
+    Log the handler calls slower than 'milliseconds', pass None to disable it.
+    """
+    global slow_handler_threshold
+    slow_handler_threshold = milliseconds / 1000 if milliseconds is not None else None
+    instrumentation.update_enabled()
+
+
+def enable_profiling(every=1):
+    """
+    Profile every Nth handler call with cProfile and aggregate the stats.
+    """
+    global profile_every, _calls
+    profile_every = every
+    _calls = itertools.count()
+    instrumentation.update_enabled()
+
+
+def disable_profiling():
+    """
+    Stop profiling the handler calls, the aggregated stats are kept until they are reset.
+    """
+    global profile_every
+    profile_every = None
+    instrumentation.update_enabled()
+
+
+def get_profile_stats():
+    """
+    Return the pstats.Stats of the profiled handler calls, None if no call is profiled.
+    """
+    return _stats
+
+
+def dump_profile_stats(path):
+    """
+    Write the aggregated stats to a file, they can be loaded with pstats or snakeviz.
+    """
+    with _stats_lock:
+        if _stats is not None:
+            _stats.dump_stats(path)
+
+
+def reset_profile_stats():
+    """
+    Drop the aggregated stats.
+    """
+    global _stats
+    with _stats_lock:
+        _stats = None
+
+
+def start_profile():
+    """
+    Return an enabled cProfile.Profile if this handler call is sampled, otherwise None.
+    """
+    every = profile_every
+    if every is None or next(_calls) % every:
+        return None
+    # The handlers called by a profiled handler are already in its profile
+    if getattr(_profiling, 'active', False):
+        return None
+
+    _profiling.active = True
+    profile = cProfile.Profile()
+    profile.enable()
+    return profile
+
+
+def stop_profile(profile):
+    """
+    Stop the profile and add it to the aggregated stats.
+    """
+    global _stats
+    profile.disable()
+    _profiling.active = False
+
+    with _stats_lock:
+        if _stats is None:
+            _stats = pstats.Stats(profile)
+        else:
+            _stats.add(profile)
+
+
+def check_slow_handler(label, handler, args, duration, queries):
+    """
+    Log the handler call if it's slower than the threshold.
+    """
+    threshold = slow_handler_threshold
+    if threshold is None or duration < threshold:
+        return
+
+    # The batch handlers are called with the model and the list of the instances
+    if handler.batch:
+        pk = [instance.pk for instance in args[1]]
+    else:
+        pk = args[0].pk
+    logger.warning(
+        'Slow handler %s of %s for %s(pk=%s) took %.1fms and executed %d queries',
+        handler.name, handler.event_type, label, pk, duration * 1000, queries,
+    )
@@ -0,0 +1,118 @@
+"""Coalescing of the post events of the objects saved several times in a transaction"""
+import weakref
+
+from asgiref.local import Local
+from django.db import transaction
+
+# The CoalescedEvents waiting for the commit of each database in the format of {using: {key: CoalescedEvent}}
+_scheduled_events = Local()
+
+
+def _get_key(instance, event_type):
+    # The objects without a primary key (e.g. bulk created) are not coalesced with each other
+    pk = instance.pk if instance.pk is not None else id(instance)
+    return instance.__class__, pk, event_type
+
+
+def _get_scheduled_events(using):
+    scheduled_events = getattr(_scheduled_events, 'events', None)
+    if scheduled_events is None:
+        scheduled_events = _scheduled_events.events = {}
+    if using not in scheduled_events:
+        # An event is only referenced by the on commit callbacks of its saves, so it's dropped
+        # from here when all of them are discarded by a rollback
+        scheduled_events[using] = weakref.WeakValueDictionary()
+    return scheduled_events[using]
+
+
+class SavedChanges:
+    """
+    The on commit callback of a save which adds the diff of the save to its CoalescedEvent.
+
+    It's discarded by the rollback of the transaction or the savepoint of the save like the
+    other on commit callbacks, so the net diff only has the changes which are committed.
+    """
+
+    __slots__ = ('event', 'instance', 'diff', '__weakref__')
+
+    def __init__(self, event, instance, diff):
+        self.event = event
+        self.instance = instance
+        self.diff = diff
+
+    def __call__(self):
+        self.event.committed(self)
+
+
+class CoalescedEvent:
+    """
+    The changes of an object saved in a transaction, the coalesced handlers of the event
+    are called once with the net diff when the transaction is committed.
+
+    The event keeps weak references to the SavedChanges of its saves, the ones discarded by
+    a rollback are dropped by Django. Since the rollbacks discard the latest callbacks,
+    the discarded saves are always at the end of the list.
+    """
+
+    def __init__(self, instance, event_type, using):
+        self.instance = instance
+        self.event_type = event_type
+        self.using = using
+        self.key = _get_key(instance, event_type)
+        self.diff = {}
+        self._saves = []
+
+    def add(self, instance, diff):
+        """
+        Register the diff of a save, it's added to the net diff when the transaction is committed.
+        """
+        self._drop_discarded_saves()
+        changes = SavedChanges(self, instance, diff)
+        self._saves.append(weakref.ref(changes))
+        # Called immediately if there is no transaction
+        transaction.on_commit(changes, using=self.using)
+
+    def committed(self, changes):
+        """
+        Add the diff of a committed save, the previous value of a field is kept from the first change.
+
+        The handlers are called after the diff of the last committed save is added.
+        """
+        self.instance = changes.instance
+        for field_name, (prev, new) in changes.diff.items():
+            if field_name in self.diff:
+                prev = self.diff[field_name][0]
+            self.diff[field_name] = (prev, new)
+
+        self._drop_discarded_saves()
+        if self._saves[-1]() is not changes:
+            return
+
+        # The saves made by the handlers are coalesced into a new event
+        scheduled_events = _get_scheduled_events(self.using)
+        if scheduled_events.get(self.key) is self:
+            del scheduled_events[self.key]
+        self._saves = []
+        self.instance._call_coalesced_actions(self.event_type, self.get_net_diff())
+
+    def _drop_discarded_saves(self):
+        saves = self._saves
+        while saves and saves[-1]() is None:
+            saves.pop()
+
+    def get_net_diff(self):
+        return {field_name: (prev, new) for field_name, (prev, new) in self.diff.items() if prev != new}
+
+
+def coalesce_event(instance, event_type, diff):
+    """
+    Add the changes of a saved object to the event which is called when the transaction is committed.
+    """
+    using = instance._state.db
+    scheduled_events = _get_scheduled_events(using)
+    key = _get_key(instance, event_type)
+
+    event = scheduled_events.get(key)
+    if event is None:
+        event = scheduled_events[key] = CoalescedEvent(instance, event_type, using)
+    event.add(instance, diff)
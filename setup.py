@@ -1,5 +1,11 @@
 from setuptools import setup
 
 setup(
-    packages=["event_actions"]
+    packages=[
+        "event_actions",
+        "event_actions.outbox",
+        "event_actions.outbox.migrations",
+        "event_actions.outbox.management",
+        "event_actions.outbox.management.commands",
+    ]
 )
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.7 on 2026-10-16 22:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+import event_actions.mixins
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0002_tdiffmodel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TDirtyModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('char_field', models.CharField(max_length=1024)),
+                ('int_field', models.IntegerField(default=0)),
+                ('fk_field', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='tests.tfkmodel')),
+            ],
+            options={
+                'abstract': False,
+            },
+            bases=(event_actions.mixins.EventActionMixin, event_actions.mixins.ModelChangesMixin, models.Model),
+        ),
+    ]
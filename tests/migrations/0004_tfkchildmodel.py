@@ -0,0 +1,26 @@
+# Generated by Django 3.2.7 on 2026-10-16 22:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+import event_actions.mixins
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0003_tdirtymodel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TFKChildModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fk_field', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tests.tfkmodel2')),
+            ],
+            options={
+                'abstract': False,
+            },
+            bases=(event_actions.mixins.EventActionMixin, event_actions.mixins.ModelChangesMixin, models.Model),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.7 on 2026-10-16 22:45
+
+from django.db import migrations, models
+import event_actions.mixins
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0004_tfkchildmodel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TBatchModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('int_field', models.IntegerField(default=0)),
+            ],
+            options={
+                'abstract': False,
+            },
+            bases=(event_actions.mixins.EventActionMixin, event_actions.mixins.ModelChangesMixin, models.Model),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.7 on 2026-10-16 23:02
+
+from django.db import migrations, models
+import event_actions.mixins
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0011_tbudgetmodel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TDigestModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text_field', models.TextField(default='')),
+                ('json_field', models.JSONField(default=dict)),
+                ('binary_field', models.BinaryField(default=b'', editable=True)),
+                ('prev_text_field', models.TextField(default='')),
+            ],
+            options={
+                'abstract': False,
+            },
+            bases=(event_actions.mixins.EventActionMixin, event_actions.mixins.ModelChangesMixin, models.Model),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.7 on 2026-10-16 23:14
+
+from django.db import migrations, models
+import event_actions.mixins
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0012_tdigestmodel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TTrackedModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('char_field', models.CharField(default='', max_length=1024)),
+                ('int_field', models.IntegerField(default=0)),
+                ('note_field', models.CharField(default='', max_length=1024)),
+            ],
+            options={
+                'abstract': False,
+            },
+            bases=(event_actions.mixins.EventActionMixin, event_actions.mixins.ModelChangesMixin, models.Model),
+        ),
+    ]
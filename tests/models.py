@@ -1,9 +1,10 @@
 import inspect
+import threading
 
 from django.db import models
 
 from event_actions.decorators import PreSaveEvent, PreCreateEvent, PostCreateEvent, PostSaveEvent, PreDeleteEvent, \
-    PostDeleteEvent, FKChangeEvent
+    PostDeleteEvent, FKChangeEvent, M2MChangeEvent
 from event_actions.models import EventActionModel
 
 
@@ -24,6 +25,8 @@ class TM2MModel(EventActionModel):
 
 
 class TModel(EventActionModel):
+    track_fields = '__all__'
+
     char_field = models.CharField(max_length=1024)
     fk_field = models.ForeignKey(TFKModel, on_delete=models.SET_NULL, null=True, blank=True)
     fk_field_2 = models.ForeignKey(TFKModel2, on_delete=models.SET_NULL, null=True, blank=True)
@@ -72,6 +75,10 @@ class TModel(EventActionModel):
     def m2m_change(self):
         raise Exception("Akbar Error!")
 
+    @M2MChangeEvent(field='m2m_field')
+    def m2m_field_changed(self, diff):
+        return mockable_function(('m2m_field_changed', diff['m2m_field']))
+
     @PreCreateEvent()
     def test_pre_create(self):
         self.pre_create_field = True
@@ -103,3 +110,183 @@ class TModel(EventActionModel):
     @FKChangeEvent(field='fk_field')
     def test_fk_instance_change_defined_field(self):
         return mockable_function('test_fk_instance_change_defined_field')
+
+
+class TDiffModel(EventActionModel):
+    char_field = models.CharField(max_length=1024)
+    int_field = models.IntegerField(default=0)
+
+    @PreSaveEvent(field='char_field')
+    def pre_save_char_field(self, diff):
+        return mockable_function(('pre_save_char_field', diff))
+
+    @PreSaveEvent(field='int_field')
+    def pre_save_int_field(self):
+        return mockable_function('pre_save_int_field')
+
+    @PreSaveEvent(fields=['char_field', 'int_field'])
+    def pre_save_both_fields(self):
+        return mockable_function('pre_save_both_fields')
+
+    @PostSaveEvent(field='char_field', new='Bar')
+    def post_save_char_field(self, diff):
+        return mockable_function(('post_save_char_field', diff))
+
+
+class TDirtyModel(EventActionModel):
+    track_dirty_fields = True
+
+    char_field = models.CharField(max_length=1024)
+    int_field = models.IntegerField(default=0)
+    fk_field = models.ForeignKey(TFKModel, on_delete=models.SET_NULL, null=True, blank=True)
+
+    @PreSaveEvent(field='int_field')
+    def pre_save_int_field(self, diff):
+        return mockable_function(('pre_save_int_field', diff))
+
+
+class TFKChildModel(EventActionModel):
+    fk_change_options = {'fk_field': {'chunk_size': 2, 'limit': 3}}
+
+    fk_field = models.ForeignKey(TFKModel2, on_delete=models.CASCADE)
+
+    @FKChangeEvent(field='fk_field')
+    def fk_changed(self):
+        return mockable_function(('fk_changed', self.pk))
+
+
+class TBatchModel(EventActionModel):
+    int_field = models.IntegerField(default=0)
+
+    @PreCreateEvent(batch=True)
+    def pre_create_batch(cls, instances):
+        return mockable_function(('pre_create_batch', cls, len(instances)))
+
+    @PostSaveEvent(field='int_field', batch=True)
+    def post_save_int_field_batch(cls, instances, diffs):
+        return mockable_function(('post_save_int_field_batch', cls, [obj.pk for obj in instances], diffs))
+
+    @PostDeleteEvent(on_commit=True)
+    def post_delete(self):
+        return mockable_function('post_delete')
+
+
+class TCommitModel(EventActionModel):
+    post_actions_on_commit = True
+
+    int_field = models.IntegerField(default=0)
+
+    @PostCreateEvent(on_commit=False)
+    def post_create(self):
+        return mockable_function('post_create')
+
+    @PostSaveEvent(field='int_field')
+    def post_save_int_field(self, diff):
+        return mockable_function(('post_save_int_field', diff))
+
+
+class TCoalesceModel(EventActionModel):
+    coalesce_post_actions = True
+
+    char_field = models.CharField(max_length=1024, default='')
+    int_field = models.IntegerField(default=0)
+
+    @PostSaveEvent(field='int_field')
+    def post_save_int_field(self, diff):
+        return mockable_function(('post_save_int_field', diff))
+
+    @PostSaveEvent(fields=['char_field', 'int_field'])
+    def post_save_both_fields(self):
+        return mockable_function('post_save_both_fields')
+
+    @PostSaveEvent(coalesce=False)
+    def post_save(self):
+        return mockable_function('post_save')
+
+
+class TAsyncModel(EventActionModel):
+    int_field = models.IntegerField(default=0)
+
+    @PreSaveEvent(field='int_field')
+    async def pre_save_int_field(self, diff):
+        return mockable_function(('pre_save_int_field', diff))
+
+    @PreSaveEvent()
+    def pre_save(self):
+        return mockable_function('pre_save')
+
+    @PostSaveEvent()
+    async def post_save(self):
+        return mockable_function('post_save')
+
+    @PostDeleteEvent()
+    async def post_delete(self):
+        return mockable_function('post_delete')
+
+
+class TBackgroundModel(EventActionModel):
+    int_field = models.IntegerField(default=0)
+
+    @PostSaveEvent(field='int_field', background=True)
+    def post_save_int_field(self, diff):
+        return mockable_function(('post_save_int_field', threading.current_thread().name, self.int_field, diff))
+
+    @PostDeleteEvent(background=True)
+    async def post_delete(self):
+        return mockable_function('post_delete')
+
+
+class TOutboxModel(EventActionModel):
+    coalesce_post_actions = True
+
+    int_field = models.IntegerField(default=0)
+
+    @PostSaveEvent(field='int_field', outbox=True)
+    def post_save_int_field(self, diff):
+        return mockable_function(('post_save_int_field', self.int_field, diff))
+
+    @PostDeleteEvent(outbox=True)
+    async def post_delete(self):
+        return mockable_function(('post_delete', self.pk))
+
+
+class TBudgetModel(EventActionModel):
+    int_field = models.IntegerField(default=0)
+
+    @PostSaveEvent(field='int_field', max_queries=1)
+    def post_save_int_field(self):
+        return mockable_function('post_save_int_field')
+
+    @PostSaveEvent()
+    def post_save(self):
+        return mockable_function('post_save')
+
+
+class TDigestModel(EventActionModel):
+    digest_fields = '__large__'
+    track_fields = '__all__'
+
+    text_field = models.TextField(default='')
+    json_field = models.JSONField(default=dict)
+    binary_field = models.BinaryField(default=b'', editable=True)
+    prev_text_field = models.TextField(default='')
+
+    @PostSaveEvent(field='text_field')
+    def post_save_text_field(self, diff):
+        return mockable_function(('post_save_text_field', diff))
+
+    @PostSaveEvent(field='prev_text_field', prev='Foo')
+    def post_save_prev_text_field(self, diff):
+        return mockable_function(('post_save_prev_text_field', diff))
+
+
+class TTrackedModel(EventActionModel):
+    track_fields = ['note_field']
+
+    char_field = models.CharField(max_length=1024, default='')
+    int_field = models.IntegerField(default=0)
+    note_field = models.CharField(max_length=1024, default='')
+
+    @PostSaveEvent(field='int_field')
+    def post_save_int_field(self):
+        return mockable_function('post_save_int_field')
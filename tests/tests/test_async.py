@@ -0,0 +1,63 @@
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+
+from tests.models import TAsyncModel, TCommitModel
+from tests.tests.base import TestBase
+
+
+class TestAsync(TestBase):
+    async def test_asave_awaits_async_handlers(self):
+        instance = await sync_to_async(TAsyncModel.objects.create)()
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            instance.int_field = 1
+            await instance.asave()
+
+        self.assertEqual(mocked_function.call_args_list, [
+            mock.call(('pre_save_int_field', {'int_field': (0, 1)})),
+            mock.call('pre_save'),
+            mock.call('post_save'),
+        ])
+        self.assertEqual((await sync_to_async(TAsyncModel.objects.get)(pk=instance.pk)).int_field, 1)
+
+    async def test_asave_checks_the_triggers(self):
+        instance = await sync_to_async(TAsyncModel.objects.create)()
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            await instance.asave()
+
+        self.assertEqual(mocked_function.call_args_list, [mock.call('pre_save'), mock.call('post_save')])
+
+    async def test_asave_without_async_handlers(self):
+        instance = TCommitModel()
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            await instance.asave()
+
+        self.assertIsNotNone(instance.pk)
+        mocked_function.assert_called_once_with('post_create')
+
+    async def test_adelete(self):
+        instance = await sync_to_async(TAsyncModel.objects.create)()
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            await instance.adelete()
+
+        mocked_function.assert_called_once_with('post_delete')
+        self.assertFalse(await sync_to_async(TAsyncModel.objects.exists)())
+
+    def test_save_calls_async_handlers(self):
+        instance = TAsyncModel.objects.create()
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            instance.int_field = 1
+            instance.save()
+            instance.delete()
+
+        self.assertEqual(mocked_function.call_args_list, [
+            mock.call(('pre_save_int_field', {'int_field': (0, 1)})),
+            mock.call('pre_save'),
+            mock.call('post_save'),
+            mock.call('post_delete'),
+        ])
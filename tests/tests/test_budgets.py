@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.test import override_settings
+
+from event_actions.decorators import PostSaveEvent
+from event_actions.exceptions import IllegalArgumentError, QueryBudgetExceeded
+from tests.models import TBudgetModel, TFKChildModel, TFKModel2
+from tests.tests.base import TestBase
+
+
+def query(_):
+    return list(TFKModel2.objects.all())
+
+
+@override_settings(EVENT_ACTIONS_QUERY_BUDGET_MODE='raise')
+class TestQueryBudgets(TestBase):
+    def setUp(self):
+        self.instance = TBudgetModel.objects.create()
+
+    def test_handler_within_budget(self):
+        with mock.patch('tests.models.mockable_function', side_effect=query):
+            self.instance.int_field = 1
+            self.instance.save()
+
+    def test_handler_exceeds_the_decorator_budget(self):
+        with mock.patch('tests.models.mockable_function', side_effect=lambda _: query(_) + query(_)):
+            self.instance.int_field = 1
+            with self.assertRaisesMessage(QueryBudgetExceeded, 'tests.TBudgetModel.post_save.post_save_int_field'):
+                self.instance.save()
+
+    @override_settings(EVENT_ACTIONS_QUERY_BUDGETS={'tests.TBudgetModel.post_save.post_save': 0})
+    def test_handler_exceeds_the_settings_budget(self):
+        with mock.patch('tests.models.mockable_function', side_effect=query):
+            with self.assertRaisesMessage(QueryBudgetExceeded, 'tests.TBudgetModel.post_save.post_save executed 1'):
+                self.instance.save()
+
+    @override_settings(EVENT_ACTIONS_QUERY_BUDGETS={'tests.TBudgetModel.post_save': 1})
+    def test_event_exceeds_the_budget(self):
+        with mock.patch('tests.models.mockable_function', side_effect=query):
+            self.instance.int_field = 1
+            with self.assertRaisesMessage(QueryBudgetExceeded, 'tests.TBudgetModel.post_save executed 2 queries'):
+                self.instance.save()
+
+    @override_settings(EVENT_ACTIONS_QUERY_BUDGETS={'tests.TFKModel2.post_save': 0})
+    def test_fk_fan_out_is_in_the_event_budget(self):
+        instance = TFKModel2.objects.create(char_field='Foo')
+        TFKChildModel.objects.create(fk_field=instance)
+
+        instance.char_field = 'Bar'
+        with self.assertRaises(QueryBudgetExceeded):
+            instance.save()
+
+    @override_settings(
+        EVENT_ACTIONS_QUERY_BUDGET_MODE='warn', EVENT_ACTIONS_QUERY_BUDGETS={'tests.TBudgetModel.post_save': 0},
+    )
+    def test_warn_mode(self):
+        with mock.patch('tests.models.mockable_function', side_effect=query):
+            with self.assertLogs('event_actions.budgets', 'WARNING'):
+                self.instance.save()
+
+    @override_settings(EVENT_ACTIONS_QUERY_BUDGET_MODE=None)
+    def test_disabled_budgets(self):
+        with mock.patch('tests.models.mockable_function', side_effect=lambda _: query(_) + query(_)):
+            self.instance.int_field = 1
+            self.instance.save()
+
+    def test_invalid_max_queries(self):
+        with self.assertRaises(IllegalArgumentError):
+            @PostSaveEvent(max_queries=-1)
+            def post_save(self):
+                pass
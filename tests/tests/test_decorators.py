@@ -4,7 +4,7 @@ from event_actions import constants
 from event_actions.decorators import PreSaveEvent, InnerEventDecoratorFactory
 from event_actions.exceptions import IllegalArgumentError
 from tests.exception import DeleteTestException
-from tests.models import TModel, TFKModel, TFKModel2
+from tests.models import TModel, TFKModel, TFKModel2, TDiffModel
 from tests.tests.base import TestBase
 
 
@@ -289,7 +289,7 @@ class TestEventDecorator(TestBase):
     def test_pre_delete_decorator(self):
         instance = self.instance
 
-        with mock.patch('tests.tests.test_decorators.TModel.test_pre_delete', autospec=True) as mocked_func:
+        with mock.patch('tests.tests.test_decorators.TModel.test_pre_delete.func', autospec=True) as mocked_func:
             mocked_func.side_effect = DeleteTestException()
             with self.assertRaises(DeleteTestException):
                 instance.delete()
@@ -304,7 +304,7 @@ class TestEventDecorator(TestBase):
     def test_post_delete_decorator(self):
         instance = self.instance
 
-        with mock.patch('tests.tests.test_decorators.TModel.test_post_delete', autospec=True) as mocked_func:
+        with mock.patch('tests.tests.test_decorators.TModel.test_post_delete.func', autospec=True) as mocked_func:
             mocked_func.side_effect = DeleteTestException()
             with self.assertRaises(DeleteTestException):
                 instance.delete()
@@ -338,6 +338,70 @@ class TestEventDecorator(TestBase):
         with mock.patch('tests.models.mockable_function') as mocked_function:
             fk_instance_2.char_field = 'Other New Foo'
             fk_instance_2.save()
-            self.assertTrue(mocked_function.called)
-            self.assert_calls(mocked_function, 'test_fk_instance_change')
-            self.assert_not_calls(mocked_function, 'test_fk_instance_change_defined_field')
+            self.assertFalse(mocked_function.called)
+
+    def test_fk_change_loads_related_objects_once(self):
+        fk_instance = TFKModel.objects.create(char_field='Foo')
+        TModel.objects.filter(id=self.instance.id).update(fk_field=fk_instance)
+        TModel.objects.create(char_field='Bar', fk_field=fk_instance)
+
+        fk_instance.char_field = 'New Foo'
+        with self.assertNumQueries(2):
+            # the update and a single select of TModel, TDirtyModel has no FK_CHANGE handlers
+            fk_instance.save()
+
+        with self.assertNumQueries(1):
+            # nothing is changed, only the update
+            fk_instance.save()
+
+
+class TestEventDispatch(TestBase):
+    def test_handlers_are_collected_in_definition_order(self):
+        self.assertEqual(
+            TDiffModel._event_handlers[constants.PRE_SAVE],
+            (TDiffModel.pre_save_char_field, TDiffModel.pre_save_int_field, TDiffModel.pre_save_both_fields)
+        )
+        self.assertEqual(TDiffModel._event_handlers[constants.POST_SAVE], (TDiffModel.post_save_char_field,))
+        self.assertNotIn(constants.PRE_CREATE, TDiffModel._event_handlers)
+
+    def test_handlers_are_called_in_definition_order(self):
+        instance = TDiffModel.objects.create(char_field='Foo', int_field=1)
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            instance.char_field = 'Baz'
+            instance.int_field = 2
+            instance.save()
+            self.assertEqual(
+                [call.args[0] for call in mocked_function.call_args_list],
+                [
+                    ('pre_save_char_field', {'char_field': ('Foo', 'Baz'), 'int_field': (1, 2)}),
+                    'pre_save_int_field',
+                    'pre_save_both_fields',
+                ]
+            )
+
+    def test_event_without_handlers_does_not_compute_diff(self):
+        with mock.patch.object(TDiffModel, '_get_diff') as get_diff:
+            TDiffModel.objects.create(char_field='Foo', int_field=1)
+            self.assertFalse(get_diff.called)
+
+    def test_only_handlers_watching_changed_fields_are_checked(self):
+        instance = TDiffModel.objects.create(char_field='Foo', int_field=1)
+
+        with mock.patch.object(TDiffModel.pre_save_int_field, 'check_trigger_function') as check_function:
+            instance.char_field = 'Bar'
+            instance.save()
+            self.assertFalse(check_function.called)
+
+    def test_handlers_watching_fields_changed_by_handlers_are_called(self):
+        instance = TDiffModel.objects.create(char_field='Foo', int_field=1)
+
+        def change_instance(value):
+            instance.int_field = 2
+            return value
+
+        with mock.patch('tests.models.mockable_function', side_effect=change_instance) as mocked_function:
+            instance.char_field = 'Bar'
+            instance.save()
+            self.assert_calls(mocked_function, 'pre_save_int_field')
+            self.assert_calls(mocked_function, 'pre_save_both_fields')
@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+from event_actions.digests import Digest, digest_json, digest_text, get_digest_function
+from tests.models import TDigestModel
+from tests.tests.base import TestBase
+
+
+class TestDigestFields(TestBase):
+    def setUp(self):
+        TDigestModel.objects.create(text_field='Foo' * 1000, json_field={'a': [1, 2]}, binary_field=b'Foo')
+        self.instance = TDigestModel.objects.get()
+
+    def test_snapshot_keeps_the_digests(self):
+        snapshot = dict(zip((field.name for field in TDigestModel._meta.concrete_fields), self.instance._initial_values))
+
+        self.assertIsInstance(snapshot['text_field'], Digest)
+        self.assertIsInstance(snapshot['json_field'], Digest)
+        self.assertIsInstance(snapshot['binary_field'], Digest)
+        # the field is watched by a handler with 'prev'
+        self.assertEqual(snapshot['prev_text_field'], '')
+
+    def test_unchanged_fields(self):
+        self.instance.text_field = 'Foo' * 1000
+        self.instance.json_field = {'a': [1, 2]}
+        self.assertEqual(self.instance.diff, {})
+
+    def test_changed_fields(self):
+        self.instance.text_field = 'Bar'
+        self.instance.binary_field = b'Bar'
+
+        diff = self.instance.diff
+        self.assertEqual(set(diff), {'text_field', 'binary_field'})
+        prev, new = diff['text_field']
+        self.assertEqual(prev, Digest('Foo' * 1000, digest_text))
+        self.assertEqual(new, 'Bar')
+
+    def test_json_changed_in_place(self):
+        self.instance.json_field['a'].append(3)
+
+        self.assertEqual(set(self.instance.diff), {'json_field'})
+
+    def test_json_keys_order(self):
+        self.assertEqual(Digest({'a': 1, 'b': 2}, digest_json), {'b': 2, 'a': 1})
+        self.assertNotEqual(Digest({'a': '1'}, digest_json), {'a': 1})
+
+    def test_json_field_encoder(self):
+        class SetEncoder(DjangoJSONEncoder):
+            def default(self, o):
+                if isinstance(o, set):
+                    return sorted(o)
+                return super().default(o)
+
+        digest_function = get_digest_function(models.JSONField(encoder=SetEncoder))
+        self.assertEqual(Digest({'tags': {1, 2}}, digest_function), {'tags': {2, 1}})
+        self.assertNotEqual(Digest({'tags': {1, 2}}, digest_function), {'tags': {1}})
+
+    def test_none_values(self):
+        self.assertEqual(Digest(None, digest_text), None)
+        self.assertNotEqual(Digest(None, digest_text), '')
+
+    def test_save_resets_the_digests(self):
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            self.instance.text_field = 'Bar'
+            self.instance.prev_text_field = 'Foo'
+            self.instance.save()
+            self.instance.prev_text_field = 'Bar'
+            self.instance.save()
+
+        mocked_function.assert_any_call(('post_save_text_field', {
+            'text_field': (Digest('Foo' * 1000, digest_text), 'Bar'), 'prev_text_field': ('', 'Foo'),
+        }))
+        mocked_function.assert_any_call(('post_save_prev_text_field', {'prev_text_field': ('Foo', 'Bar')}))
+        self.assertEqual(self.instance.diff, {})
+        self.assertEqual(self.instance._initial_values[1], Digest('Bar', digest_text))
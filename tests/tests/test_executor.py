@@ -0,0 +1,119 @@
+import threading
+from unittest import mock
+
+from django.test import override_settings
+
+from event_actions import executor
+from event_actions.decorators import PreSaveEvent
+from event_actions.exceptions import IllegalArgumentError
+from event_actions.executor import BackgroundExecutor
+from tests.models import TBackgroundModel
+from tests.tests.base import TestBase
+
+
+class TestBackgroundExecutor(TestBase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.calls = []
+
+    def block(self):
+        self.release.wait(5)
+
+    def submit_when_full(self, on_full):
+        background_executor = BackgroundExecutor(max_workers=1, queue_size=1, on_full=on_full)
+        background_executor.submit(self.block)
+        # wait for the worker to take the first function, then fill the queue
+        while background_executor._queue.qsize():
+            pass
+        background_executor.submit(self.calls.append, 'queued')
+        return background_executor
+
+    def test_drop_when_full(self):
+        background_executor = self.submit_when_full('drop')
+
+        with self.assertLogs('event_actions.executor', 'WARNING'):
+            background_executor.submit(self.calls.append, 'dropped')
+
+        self.release.set()
+        background_executor.shutdown()
+        self.assertEqual(self.calls, ['queued'])
+
+    def test_inline_when_full(self):
+        background_executor = self.submit_when_full('inline')
+
+        background_executor.submit(self.calls.append, 'inline')
+        self.assertEqual(self.calls, ['inline'])
+
+        self.release.set()
+        background_executor.shutdown()
+        self.assertEqual(self.calls, ['inline', 'queued'])
+
+    def test_block_when_full(self):
+        background_executor = self.submit_when_full('block')
+
+        submitter = threading.Thread(target=background_executor.submit, args=(self.calls.append, 'blocked'))
+        submitter.start()
+        submitter.join(0.05)
+        self.assertTrue(submitter.is_alive())
+
+        self.release.set()
+        submitter.join()
+        background_executor.shutdown()
+        self.assertEqual(self.calls, ['queued', 'blocked'])
+
+    def test_shutdown_drains_the_queue(self):
+        background_executor = BackgroundExecutor(max_workers=2)
+        for i in range(10):
+            background_executor.submit(self.calls.append, i)
+
+        background_executor.shutdown()
+
+        self.assertEqual(sorted(self.calls), list(range(10)))
+        with self.assertRaises(RuntimeError):
+            background_executor.submit(self.calls.append, 10)
+
+    def test_failed_function_is_logged(self):
+        background_executor = BackgroundExecutor(max_workers=1)
+
+        with self.assertLogs('event_actions.executor', 'ERROR'):
+            background_executor.submit(int, 'Foo')
+            background_executor.drain()
+
+        background_executor.shutdown()
+
+    def test_invalid_policy(self):
+        with self.assertRaises(IllegalArgumentError):
+            BackgroundExecutor(on_full='Foo')
+
+
+@override_settings(EVENT_ACTIONS_BACKGROUND={'max_workers': 1})
+class TestBackgroundHandlers(TestBase):
+    def tearDown(self):
+        executor.shutdown_executor()
+
+    def test_handler_is_called_in_the_background(self):
+        instance = TBackgroundModel.objects.create()
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            instance.int_field = 1
+            instance.save()
+            # the handler gets a copy of the instance
+            instance.int_field = 2
+            executor.get_executor().drain()
+
+        mocked_function.assert_called_once_with(('post_save_int_field', 'event_actions_0', 1, {'int_field': (0, 1)}))
+
+    def test_async_handler_is_called_in_the_background(self):
+        instance = TBackgroundModel.objects.create()
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            instance.delete()
+            executor.get_executor().drain()
+
+        mocked_function.assert_called_once_with('post_delete')
+
+    def test_background_pre_event(self):
+        with self.assertRaises(IllegalArgumentError):
+            @PreSaveEvent(background=True)
+            def pre_save(self):
+                pass
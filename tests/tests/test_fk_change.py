@@ -0,0 +1,91 @@
+from unittest import mock
+
+from django.apps import apps
+from django.db.models import QuerySet
+
+from event_actions.exceptions import FKChangeLimitExceeded
+from event_actions.mixins import clear_relations_cache
+from tests.models import TModel, TFKModel2, TFKChildModel
+from tests.tests.base import TestBase
+
+
+class TestFKChangeOptions(TestBase):
+    def setUp(self):
+        self.fk_instance = TFKModel2.objects.create(char_field='Foo')
+        self.children = [TFKChildModel.objects.create(fk_field=self.fk_instance) for _ in range(4)]
+
+    def change_fk_instance(self):
+        self.fk_instance.char_field += '!'
+        self.fk_instance.save()
+
+    def test_related_objects_are_notified_in_chunks(self):
+        options = {'chunk_size': 2, 'limit': None}
+        with mock.patch.dict(TFKChildModel.fk_change_options, {'fk_field': options}):
+            with mock.patch('tests.models.mockable_function') as mocked_function:
+                self.change_fk_instance()
+                for child in self.children:
+                    self.assert_calls(mocked_function, ('fk_changed', child.pk))
+
+    def test_related_objects_are_loaded_with_all_fields(self):
+        options = {'limit': None}
+        with mock.patch.dict(TFKChildModel.fk_change_options, {'fk_field': options}):
+            with mock.patch.object(QuerySet, 'only', autospec=True, side_effect=QuerySet.only) as only:
+                self.change_fk_instance()
+                only.assert_not_called()
+
+    def test_only_option_limits_loaded_fields(self):
+        options = {'limit': None, 'only': []}
+        with mock.patch.dict(TFKChildModel.fk_change_options, {'fk_field': options}):
+            with mock.patch.object(QuerySet, 'only', autospec=True, side_effect=QuerySet.only) as only:
+                self.change_fk_instance()
+                only.assert_called_once_with(mock.ANY, 'id', 'fk_field')
+
+    def test_limit_raises(self):
+        with self.assertRaises(FKChangeLimitExceeded):
+            self.change_fk_instance()
+
+    def test_limit_skips_remaining_objects(self):
+        options = {'chunk_size': 2, 'limit': 3, 'on_limit': 'skip'}
+        with mock.patch.dict(TFKChildModel.fk_change_options, {'fk_field': options}):
+            with mock.patch('tests.models.mockable_function') as mocked_function:
+                with self.assertLogs('event_actions.mixins', level='WARNING'):
+                    self.change_fk_instance()
+                self.assert_calls(mocked_function, ('fk_changed', self.children[2].pk))
+                self.assert_not_calls(mocked_function, ('fk_changed', self.children[3].pk))
+
+    def test_limit_spills_remaining_objects(self):
+        spill = mock.Mock()
+        options = {'chunk_size': 2, 'limit': 3, 'on_limit': spill}
+        with mock.patch.dict(TFKChildModel.fk_change_options, {'fk_field': options}):
+            self.change_fk_instance()
+
+        instance, field, remaining_objs = spill.call_args[0]
+        self.assertEqual(instance, self.fk_instance)
+        self.assertEqual(field, TFKChildModel._meta.get_field('fk_field'))
+        self.assertEqual(list(remaining_objs), [self.children[3]])
+
+
+class TestFKChangeRelationsCache(TestBase):
+    def tearDown(self):
+        clear_relations_cache()
+
+    def test_relations_are_cached(self):
+        relations = TFKModel2._get_fk_change_relations()
+        self.assertEqual(
+            {fk.field for fk in relations},
+            {TModel._meta.get_field('fk_field_2'), TFKChildModel._meta.get_field('fk_field')}
+        )
+
+        with mock.patch.object(TFKChildModel, '_watches_fk') as watches_fk:
+            self.assertIs(TFKModel2._get_fk_change_relations(), relations)
+            self.assertFalse(watches_fk.called)
+
+    def test_cache_is_invalidated(self):
+        relations = TFKModel2._get_fk_change_relations()
+
+        apps.clear_cache()
+        self.assertIsNot(TFKModel2._get_fk_change_relations(), relations)
+
+        relations = TFKModel2._get_fk_change_relations()
+        clear_relations_cache()
+        self.assertIsNot(TFKModel2._get_fk_change_relations(), relations)
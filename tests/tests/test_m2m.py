@@ -0,0 +1,77 @@
+from unittest import mock
+
+from event_actions.m2m import M2MChange
+from tests.models import TModel, TM2MModel
+from tests.tests.base import TestBase
+
+
+class TestM2MChange(TestBase):
+    def setUp(self):
+        self.instance = TModel.objects.create(char_field='Foo')
+        self.related_objs = [TM2MModel.objects.create(char_field=str(i)) for i in range(4)]
+        self.pks = [obj.pk for obj in self.related_objs]
+
+    def assert_changes(self, mocked_function, *changes):
+        self.assertEqual(
+            mocked_function.call_args_list, [mock.call(('m2m_field_changed', change)) for change in changes],
+        )
+
+    def test_add(self):
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            self.instance.m2m_field.add(*self.related_objs[:2])
+            # the objects which are already added are not changed
+            self.instance.m2m_field.add(self.related_objs[0])
+
+        self.assert_changes(mocked_function, M2MChange(frozenset(self.pks[:2]), frozenset(), False))
+
+    def test_remove(self):
+        self.instance.m2m_field.add(*self.related_objs)
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            self.instance.m2m_field.remove(*self.related_objs[:2])
+
+        self.assert_changes(mocked_function, M2MChange(frozenset(), frozenset(self.pks[:2]), False))
+
+    def test_clear(self):
+        self.instance.m2m_field.add(*self.related_objs[:2])
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            self.instance.m2m_field.clear()
+
+        self.assert_changes(mocked_function, M2MChange(frozenset(), frozenset(self.pks[:2]), True))
+
+    def test_set_is_dispatched_once(self):
+        self.instance.m2m_field.add(*self.related_objs[:2])
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            self.instance.m2m_field.set(self.related_objs[1:3])
+
+        self.assert_changes(mocked_function, M2MChange(frozenset(self.pks[2:3]), frozenset(self.pks[:1]), False))
+
+    def test_set_with_clear(self):
+        self.instance.m2m_field.add(*self.related_objs[:2])
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            self.instance.m2m_field.set(self.related_objs[1:3], clear=True)
+
+        self.assert_changes(mocked_function, M2MChange(frozenset(self.pks[2:3]), frozenset(self.pks[:1]), True))
+
+    def test_set_without_changes(self):
+        self.instance.m2m_field.add(*self.related_objs[:2])
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            self.instance.m2m_field.set(self.related_objs[:2])
+
+        self.assertFalse(mocked_function.called)
+
+    def test_set_does_not_load_the_related_objects(self):
+        with mock.patch('tests.models.mockable_function'):
+            # the queries of Django's set(): select the existing pks, the missing pks and insert the rows
+            with self.assertNumQueries(3):
+                self.instance.m2m_field.set(self.pks)
+
+    def test_reverse_changes_are_not_dispatched(self):
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            self.related_objs[0].tmodel_set.add(self.instance)
+
+        self.assertFalse(mocked_function.called)
@@ -0,0 +1,198 @@
+from unittest import mock
+
+from django.db.models import F, QuerySet
+
+from tests.models import TModel, TFKModel, TFKModel2, TM2MModel, TDiffModel, TBatchModel, TFKChildModel
+from tests.tests.base import TestBase
+
+
+class TestEventActionQuerySet(TestBase):
+    def test_bulk_create_calls_create_actions(self):
+        objs = [TModel(char_field='Foo'), TModel(char_field='Bar')]
+
+        with self.assertNumQueries(1):
+            TModel.objects.bulk_create(objs)
+
+        for obj in objs:
+            self.assertTrue(obj.pre_create_field)
+            self.assertTrue(obj.post_create_field)
+            self.assertEqual(obj.diff, {'post_create_field': (False, True)})
+
+        self.assertEqual(TModel.objects.filter(pre_create_field=True).count(), 2)
+        self.assertEqual(TModel.objects.filter(post_create_field=True).count(), 0)
+
+    def test_bulk_update_updates_changed_fields(self):
+        TDiffModel.objects.bulk_create([TDiffModel(char_field='Foo', int_field=i) for i in range(3)])
+        objs = list(TDiffModel.objects.order_by('id'))
+
+        objs[0].char_field = 'Bar'
+        objs[1].int_field = 10
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            with mock.patch('django.db.models.QuerySet.bulk_update') as bulk_update:
+                TDiffModel.objects.bulk_update(objs)
+                self.assertEqual(bulk_update.call_args[0], (objs, ['char_field', 'int_field']))
+
+            self.assert_calls(mocked_function, ('pre_save_char_field', {'char_field': ('Foo', 'Bar')}))
+            self.assert_calls(mocked_function, ('post_save_char_field', {'char_field': ('Foo', 'Bar')}))
+            self.assert_calls(mocked_function, 'pre_save_int_field')
+            self.assertEqual(mocked_function.call_count, 3)
+
+        for obj in objs:
+            self.assertEqual(obj.diff, {})
+
+    def test_bulk_update_writes_objects(self):
+        TDiffModel.objects.bulk_create([TDiffModel(char_field='Foo', int_field=i) for i in range(3)])
+        objs = list(TDiffModel.objects.order_by('id'))
+
+        for obj in objs:
+            obj.int_field += 10
+        TDiffModel.objects.bulk_update(objs)
+
+        self.assertEqual(list(TDiffModel.objects.order_by('id').values_list('int_field', flat=True)), [10, 11, 12])
+
+    def test_bulk_update_with_fields(self):
+        obj = TDiffModel.objects.create(char_field='Foo', int_field=1)
+
+        obj.char_field = 'Bar'
+        obj.int_field = 2
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            TDiffModel.objects.bulk_update([obj], ['int_field'])
+            self.assert_calls(mocked_function, 'pre_save_int_field')
+            self.assert_not_calls(mocked_function, ('pre_save_char_field', mock.ANY))
+            self.assert_not_calls(mocked_function, ('post_save_char_field', mock.ANY))
+            self.assert_not_calls(mocked_function, 'pre_save_both_fields')
+
+        # the changes of the fields which are not updated are kept
+        self.assertEqual(obj.diff, {'char_field': ('Foo', 'Bar')})
+        obj.refresh_from_db()
+        self.assertEqual(obj.char_field, 'Foo')
+        self.assertEqual(obj.int_field, 2)
+
+    def test_bulk_create_with_ignore_conflicts(self):
+        obj = TDiffModel.objects.create(char_field='Foo')
+        TDiffModel.objects.bulk_create([TDiffModel(id=obj.id, char_field='Bar')], ignore_conflicts=True)
+        self.assertEqual(TDiffModel.objects.get().char_field, 'Foo')
+
+        with self.assertRaises(ValueError):
+            TModel.objects.bulk_create([TModel(char_field='Foo')], ignore_conflicts=True)
+        self.assertFalse(TModel.objects.exists())
+
+
+class TestBatchHandlers(TestBase):
+    def test_batch_handler_is_called_once_per_bulk_operation(self):
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            TBatchModel.objects.bulk_create([TBatchModel(), TBatchModel(), TBatchModel()])
+            mocked_function.assert_called_once_with(('pre_create_batch', TBatchModel, 3))
+
+        objs = list(TBatchModel.objects.order_by('id'))
+        objs[0].int_field = 1
+        objs[2].int_field = 2
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            TBatchModel.objects.bulk_update(objs)
+            mocked_function.assert_called_once_with((
+                'post_save_int_field_batch', TBatchModel, [objs[0].pk, objs[2].pk],
+                [{'int_field': (0, 1)}, {'int_field': (0, 2)}]
+            ))
+
+    def test_batch_handler_is_called_on_save(self):
+        obj = TBatchModel.objects.create()
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            obj.int_field = 1
+            obj.save()
+            mocked_function.assert_called_once_with((
+                'post_save_int_field_batch', TBatchModel, [obj.pk], [{'int_field': (0, 1)}]
+            ))
+
+
+class TestEventActionUpdate(TestBase):
+    def test_update_calls_save_actions(self):
+        obj = TDiffModel.objects.create(char_field='Foo', int_field=1)
+        TDiffModel.objects.create(char_field='Bar', int_field=1)
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            with self.assertNumQueries(2):
+                rows = TDiffModel.objects.filter(char_field='Foo').update(char_field='Bar')
+
+            self.assertEqual(rows, 1)
+            self.assert_calls(mocked_function, ('pre_save_char_field', {'char_field': ('Foo', 'Bar')}))
+            self.assert_calls(mocked_function, ('post_save_char_field', {'char_field': ('Foo', 'Bar')}))
+            self.assertEqual(mocked_function.call_count, 2)
+
+        obj.refresh_from_db()
+        self.assertEqual(obj.char_field, 'Bar')
+
+    def test_update_with_expressions(self):
+        objs = TBatchModel.objects.bulk_create([TBatchModel(int_field=1), TBatchModel(int_field=5)])
+        pks = list(TBatchModel.objects.order_by('id').values_list('id', flat=True))
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            TBatchModel.objects.update(int_field=F('int_field') * 2)
+            mocked_function.assert_called_once_with((
+                'post_save_int_field_batch', TBatchModel, pks,
+                [{'int_field': (1, 2)}, {'int_field': (5, 10)}]
+            ))
+
+        self.assertEqual(list(TBatchModel.objects.order_by('id').values_list('int_field', flat=True)), [2, 10])
+
+    def test_update_converts_values_to_field_types(self):
+        obj = TDiffModel.objects.create(char_field='Foo', int_field=6)
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            TDiffModel.objects.filter(id=obj.id).update(int_field='6')
+            self.assert_not_calls(mocked_function, 'pre_save_int_field')
+
+            TDiffModel.objects.filter(id=obj.id).update(int_field='7')
+            self.assert_calls(mocked_function, 'pre_save_int_field')
+
+        obj.refresh_from_db()
+        self.assertEqual(obj.int_field, 7)
+
+    def test_update_with_related_object_pk(self):
+        fk_instance = TFKModel.objects.create(char_field='Foo')
+        obj = TModel.objects.create(char_field='Foo')
+
+        TModel.objects.filter(id=obj.id).update(fk_field=fk_instance.pk)
+        obj.refresh_from_db()
+        self.assertEqual(obj.fk_field, fk_instance)
+
+    def test_update_raises_error_of_django_for_invalid_fields(self):
+        with self.assertRaises(Exception) as django_error:
+            QuerySet(TDiffModel).update(invalid_field=1)
+
+        with self.assertRaises(type(django_error.exception)):
+            TDiffModel.objects.update(invalid_field=1)
+
+    def test_update_of_values_queryset(self):
+        obj = TDiffModel.objects.create(char_field='Foo')
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            rows = TDiffModel.objects.filter(id=obj.id).values('id').update(int_field=3)
+            self.assert_calls(mocked_function, 'pre_save_int_field')
+
+        self.assertEqual(rows, 1)
+        obj.refresh_from_db()
+        self.assertEqual(obj.int_field, 3)
+
+    def test_update_of_sliced_queryset(self):
+        TModel.objects.create(char_field='Foo')
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            with self.assertRaises((AssertionError, TypeError)):
+                TModel.objects.all()[:1].update(int_field=3)
+            mocked_function.assert_not_called()
+
+    def test_update_without_save_handlers(self):
+        TM2MModel.objects.create(char_field='Foo')
+        with self.assertNumQueries(1):
+            TM2MModel.objects.update(char_field='Bar')
+
+    def test_update_notifies_related_objects(self):
+        fk_instance = TFKModel2.objects.create(char_field='Foo')
+        child = TFKChildModel.objects.create(fk_field=fk_instance)
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            TFKModel2.objects.update(char_field='Bar')
+            self.assert_calls(mocked_function, ('fk_changed', child.pk))
@@ -0,0 +1,69 @@
+from unittest import mock
+
+from event_actions import metrics
+from event_actions.metrics import InMemorySink, LoggingSink, CallbackSink
+from tests.models import TDiffModel, TFKModel
+from tests.tests.base import TestBase
+
+
+class TestMetrics(TestBase):
+    def setUp(self):
+        self.instance = TDiffModel.objects.create(char_field='Foo')
+        self.sink = InMemorySink()
+        metrics.set_metrics_sink(self.sink)
+
+    def tearDown(self):
+        metrics.set_metrics_sink(None)
+
+    def test_in_memory_sink(self):
+        with mock.patch('tests.models.mockable_function', side_effect=lambda _: TFKModel.objects.count()):
+            self.instance.char_field = 'Bar'
+            self.instance.save()
+            self.instance.char_field = 'Baz'
+            self.instance.save()
+
+        stats = self.sink.stats
+        self.assertEqual(set(stats), {
+            ('tests.TDiffModel', 'pre_save', 'pre_save_char_field'),
+            ('tests.TDiffModel', 'pre_save', 'pre_save_both_fields'),
+            ('tests.TDiffModel', 'post_save', 'post_save_char_field'),
+        })
+
+        pre_save_stats = stats[('tests.TDiffModel', 'pre_save', 'pre_save_char_field')]
+        self.assertEqual((pre_save_stats.calls, pre_save_stats.rejected, pre_save_stats.queries), (2, 0, 2))
+        self.assertEqual(sum(pre_save_stats.histogram), 2)
+        self.assertGreater(pre_save_stats.total_duration, 0)
+
+        # the second save doesn't match new='Bar'
+        post_save_stats = stats[('tests.TDiffModel', 'post_save', 'post_save_char_field')]
+        self.assertEqual((post_save_stats.calls, post_save_stats.rejected), (1, 1))
+
+    def test_logging_sink(self):
+        metrics.set_metrics_sink(LoggingSink())
+
+        with self.assertLogs('event_actions.metrics', 'DEBUG') as logs:
+            self.instance.char_field = 'Baz'
+            self.instance.save()
+
+        self.assertEqual(len(logs.records), 3)
+        self.assertIn('was not triggered', logs.output[-1])
+
+    def test_callback_sink(self):
+        callback = mock.MagicMock()
+        metrics.set_metrics_sink(CallbackSink(callback))
+
+        self.instance.int_field = 1
+        self.instance.save()
+
+        tags = {'model': 'tests.TDiffModel', 'event_type': 'pre_save', 'handler': 'pre_save_int_field'}
+        callback.assert_any_call('event_actions.handler.duration', mock.ANY, tags)
+        callback.assert_any_call('event_actions.handler.queries', 0, tags)
+
+    def test_disabled_metrics(self):
+        metrics.set_metrics_sink(None)
+
+        with mock.patch('event_actions.instrumentation.instrument') as instrument:
+            self.instance.char_field = 'Bar'
+            self.instance.save()
+
+        self.assertFalse(instrument.called)
@@ -0,0 +1,300 @@
+from unittest import mock
+
+from django.db import connection
+from django.db.models import DEFERRED
+from django.test.utils import CaptureQueriesContext
+
+from event_actions.mixins import DiffCache, clear_relations_cache
+from tests.models import TModel, TFKModel, TDiffModel, TDigestModel, TDirtyModel, TTrackedModel
+from tests.tests.base import TestBase
+
+
+class TestModelChangesMixin(TestBase):
+    def setUp(self):
+        self.instance = TModel.objects.create(
+            char_field='Foo',
+            int_field=1
+        )
+
+    def test_diff_of_loaded_instance(self):
+        instance = TModel.objects.get(id=self.instance.id)
+        self.assertEqual(instance.diff, {})
+
+        instance.char_field = 'Bar'
+        instance.int_field = 2
+        self.assertEqual(instance.diff, {'char_field': ('Foo', 'Bar'), 'int_field': (1, 2)})
+        self.assertEqual(set(instance.changed_fields), {'char_field', 'int_field'})
+        self.assertEqual(instance.get_prev_value('char_field'), 'Foo')
+        self.assertEqual(instance.get_new_value('char_field'), 'Bar')
+
+    def test_diff_is_reset_on_save(self):
+        instance = TFKModel.objects.create(char_field='Foo')
+        instance.char_field = 'Bar'
+        self.assertEqual(instance.diff, {'char_field': ('Foo', 'Bar')})
+
+        instance.save()
+        self.assertEqual(instance.diff, {})
+
+    def test_diff_uses_fk_value(self):
+        fk_instance = TFKModel.objects.create(char_field='Foo')
+        instance = TModel.objects.get(id=self.instance.id)
+
+        instance.fk_field = fk_instance
+        self.assertEqual(instance.get_field_diff('fk_field'), (None, fk_instance.id))
+
+    def test_diff_does_not_load_deferred_fields(self):
+        instance = TModel.objects.only('id', 'int_field').get(id=self.instance.id)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(instance.diff, {})
+            instance.int_field = 2
+            self.assertEqual(instance.diff, {'int_field': (1, 2)})
+
+    def test_loaded_deferred_field_is_not_changed(self):
+        instance = TModel.objects.only('id').get(id=self.instance.id)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(instance.char_field, 'Foo')
+        self.assertEqual(instance.diff, {})
+
+    def test_assigned_deferred_field_is_changed(self):
+        instance = TModel.objects.only('id').get(id=self.instance.id)
+
+        instance.char_field = 'Bar'
+        self.assertEqual(instance.diff, {'char_field': (DEFERRED, 'Bar')})
+        instance.save()
+        self.assertEqual(TModel.objects.get(id=instance.id).char_field, 'Bar')
+
+    def test_refresh_from_db_resets_the_refreshed_fields(self):
+        instance = TModel.objects.get(id=self.instance.id)
+        TModel.objects.filter(id=instance.id).update(char_field='Bar')
+
+        instance.int_field = 2
+        instance.refresh_from_db(fields=['char_field'])
+        self.assertEqual(instance.char_field, 'Bar')
+        self.assertEqual(instance.diff, {'int_field': (1, 2)})
+
+        instance.refresh_from_db()
+        self.assertEqual(instance.diff, {})
+
+
+class TestDiffCache(TestBase):
+    def setUp(self):
+        self.instance = TDiffModel.objects.create(char_field='Foo', int_field=1)
+
+    def test_diff_is_computed_once_per_event(self):
+        instance = self.instance
+        instance.char_field = 'Bar'
+
+        with mock.patch.object(TDiffModel, '_get_diff', autospec=True, side_effect=TDiffModel._get_diff) as get_diff:
+            instance.save()
+            # one for the pre save and one for the post save handlers
+            self.assertEqual(get_diff.call_count, 2)
+
+    def test_handler_receives_diff(self):
+        instance = self.instance
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            instance.char_field = 'Bar'
+            instance.save()
+            self.assert_calls(mocked_function, ('pre_save_char_field', {'char_field': ('Foo', 'Bar')}))
+            self.assert_calls(mocked_function, ('post_save_char_field', {'char_field': ('Foo', 'Bar')}))
+            self.assert_not_calls(mocked_function, 'pre_save_int_field')
+            self.assert_not_calls(mocked_function, 'pre_save_both_fields')
+
+    def test_handler_is_called_for_assigned_deferred_field(self):
+        instance = TDiffModel.objects.only('id').get(id=self.instance.id)
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            instance.char_field = 'Bar'
+            instance.save()
+            self.assert_calls(mocked_function, ('pre_save_char_field', {'char_field': (DEFERRED, 'Bar')}))
+            self.assert_calls(mocked_function, ('post_save_char_field', {'char_field': (DEFERRED, 'Bar')}))
+            self.assert_not_calls(mocked_function, 'pre_save_int_field')
+
+    def test_diff_is_invalidated_when_handler_changes_the_instance(self):
+        instance = self.instance
+        instance.char_field = 'Bar'
+        diff_cache = DiffCache(instance)
+
+        diff = diff_cache.diff
+        diff_cache.handler_called()
+        self.assertIs(diff_cache.diff, diff)
+
+        instance.int_field = 2
+        diff_cache.handler_called()
+        self.assertEqual(diff_cache.diff, {'char_field': ('Foo', 'Bar'), 'int_field': (1, 2)})
+
+    def test_post_handlers_receive_saved_changes(self):
+        instance = self.instance
+
+        def change_instance(value):
+            instance.int_field = 2
+            return value
+
+        with mock.patch('tests.models.mockable_function', side_effect=change_instance) as mocked_function:
+            instance.char_field = 'Bar'
+            instance.save()
+            self.assert_calls(mocked_function, ('post_save_char_field', {
+                'char_field': ('Foo', 'Bar'), 'int_field': (1, 2)
+            }))
+
+
+class TestDirtyFields(TestBase):
+    def setUp(self):
+        self.instance = TDirtyModel.objects.create(char_field='Foo', int_field=1)
+
+    def test_loaded_instance_has_no_dirty_fields(self):
+        instance = TDirtyModel.objects.get(id=self.instance.id)
+        self.assertEqual(instance._dirty_fields, set())
+        self.assertEqual(instance.diff, {})
+
+    def test_only_dirty_fields_are_compared(self):
+        instance = TDirtyModel.objects.get(id=self.instance.id)
+        fk_instance = TFKModel.objects.create(char_field='Foo')
+
+        # a field which is changed without an assignment is not tracked
+        instance.__dict__['char_field'] = 'Bar'
+        self.assertEqual(instance.diff, {})
+
+        instance.char_field = 'Foo'
+        instance.int_field = 2
+        instance.fk_field = fk_instance
+        self.assertEqual(instance._dirty_fields, {'char_field', 'int_field', 'fk_field'})
+        self.assertEqual(instance.diff, {'int_field': (1, 2), 'fk_field': (None, fk_instance.id)})
+
+    def test_dirty_fields_are_reset_on_save(self):
+        instance = self.instance
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            instance.int_field = 2
+            instance.save()
+            self.assert_calls(mocked_function, ('pre_save_int_field', {'int_field': (1, 2)}))
+
+        self.assertEqual(instance._dirty_fields, set())
+        self.assertEqual(instance.diff, {})
+
+
+class TestTrackedFields(TestBase):
+    def setUp(self):
+        self.instance = TTrackedModel.objects.create(char_field='Foo', int_field=1, note_field='Foo')
+
+    def tearDown(self):
+        clear_relations_cache()
+
+    def test_tracked_fields(self):
+        self.assertEqual(TTrackedModel._get_tracked_field_names(), {'int_field', 'note_field'})
+        self.assertIsNone(TModel._get_tracked_field_names())
+
+    def test_all_fields_are_tracked_for_handlers_receiving_diff(self):
+        self.assertIsNone(TDirtyModel._get_tracked_field_names())
+
+        instance = TDiffModel.objects.create(char_field='Foo')
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            instance.char_field = 'Bar'
+            instance.int_field = 2
+            instance.save()
+            self.assert_calls(mocked_function, ('pre_save_char_field', {
+                'char_field': ('Foo', 'Bar'), 'int_field': (0, 2)
+            }))
+
+    def test_untracked_fields_are_not_compared(self):
+        instance = TTrackedModel.objects.get(id=self.instance.id)
+        instance.char_field = 'Bar'
+        instance.int_field = 2
+        instance.note_field = 'Bar'
+        self.assertEqual(instance.diff, {'int_field': (1, 2), 'note_field': ('Foo', 'Bar')})
+
+    def test_tracked_fields_are_invalidated_with_related_objects(self):
+        self.assertIsNotNone(TTrackedModel._get_tracked_positions())
+
+        # a model with a FK_CHANGE handler on this model is registered
+        with mock.patch.object(TTrackedModel, '_get_fk_change_relations', return_value=(object(),)):
+            TTrackedModel._meta._expire_cache()
+            self.assertIsNone(TTrackedModel._get_tracked_positions())
+        TTrackedModel._meta._expire_cache()
+
+    def test_untracked_fields_are_saved(self):
+        instance = TTrackedModel.objects.get(id=self.instance.id)
+        instance.char_field = 'Bar'
+        instance.save()
+        self.assertEqual(TTrackedModel.objects.get(id=instance.id).char_field, 'Bar')
+
+    def test_bulk_update_saves_untracked_fields(self):
+        instance = TTrackedModel.objects.get(id=self.instance.id)
+        instance.char_field = 'Bar'
+        TTrackedModel.objects.bulk_update([instance])
+        self.assertEqual(TTrackedModel.objects.get(id=instance.id).char_field, 'Bar')
+
+
+class TestUpdateFields(TestBase):
+    def setUp(self):
+        self.instance = TDiffModel.objects.create(char_field='Foo', int_field=1)
+
+    def test_diff_is_restricted_to_update_fields(self):
+        instance = self.instance
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            instance.char_field = 'Bar'
+            instance.int_field = 2
+            instance.save(update_fields=['int_field'])
+            self.assert_calls(mocked_function, 'pre_save_int_field')
+            self.assert_not_calls(mocked_function, ('pre_save_char_field', {'char_field': ('Foo', 'Bar')}))
+            self.assert_not_calls(mocked_function, 'pre_save_both_fields')
+
+        # the snapshot of the fields which are not saved is kept
+        self.assertEqual(instance.diff, {'char_field': ('Foo', 'Bar')})
+        self.assertEqual(TDiffModel.objects.get(id=instance.id).char_field, 'Foo')
+
+    def test_save_changed_fields_only(self):
+        instance = TDiffModel.objects.get(id=self.instance.id)
+
+        with mock.patch.object(TDiffModel, 'save_changed_fields_only', True):
+            instance.int_field = 2
+            with CaptureQueriesContext(connection) as queries:
+                instance.save()
+
+            self.assertEqual(len(queries), 1)
+            self.assertIn('int_field', queries[0]['sql'])
+            self.assertNotIn('char_field', queries[0]['sql'])
+            self.assertEqual(instance.diff, {})
+
+            with self.assertNumQueries(0):
+                instance.save()
+
+    def test_save_changed_fields_only_saves_changes_of_pre_handlers(self):
+        instance = TDiffModel.objects.get(id=self.instance.id)
+
+        def change_instance(value):
+            instance.int_field = 3
+            return value
+
+        with mock.patch.object(TDiffModel, 'save_changed_fields_only', True), \
+                mock.patch('tests.models.mockable_function', side_effect=change_instance):
+            instance.char_field = 'Bar'
+            instance.save()
+
+        instance = TDiffModel.objects.get(id=instance.id)
+        self.assertEqual((instance.char_field, instance.int_field), ('Bar', 3))
+
+    def test_save_changed_fields_only_saves_values_changed_in_place(self):
+        with mock.patch.object(TDigestModel, 'save_changed_fields_only', True), \
+                mock.patch.object(TDigestModel, '_digest_functions', ()):
+            instance = TDigestModel.objects.create(json_field={'a': 1})
+            instance = TDigestModel.objects.get(id=instance.id)
+
+            instance.json_field['a'] = 2
+            instance.save()
+
+        self.assertEqual(TDigestModel.objects.get(id=instance.id).json_field, {'a': 2})
+
+    def test_save_changed_fields_only_inserts_deleted_row(self):
+        instance = TDiffModel.objects.get(id=self.instance.id)
+        TDiffModel.objects.filter(id=instance.id).delete()
+
+        with mock.patch.object(TDiffModel, 'save_changed_fields_only', True):
+            instance.int_field = 2
+            instance.save()
+
+        instance = TDiffModel.objects.get(id=instance.id)
+        self.assertEqual((instance.char_field, instance.int_field), ('Foo', 2))
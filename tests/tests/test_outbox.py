@@ -0,0 +1,162 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+
+from event_actions import constants
+from event_actions.decorators import PostSaveEvent, PreSaveEvent
+from event_actions.exceptions import IllegalArgumentError
+from event_actions.outbox.models import OutboxEvent
+from event_actions.outbox.records import add_outbox_record
+from event_actions.outbox.worker import drain_outbox
+from tests.models import TOutboxModel
+from tests.tests.base import TestBase
+
+
+class TestOutbox(TestBase):
+    def test_save_writes_outbox_event(self):
+        instance = TOutboxModel.objects.create()
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            instance.int_field = 1
+            instance.save()
+            instance.save()
+
+        self.assertFalse(mocked_function.called)
+        event = OutboxEvent.objects.get()
+        self.assertEqual(
+            (event.model, event.object_pk, event.event_type, event.handler, event.diff),
+            ('tests.toutboxmodel', str(instance.pk), 'post_save', 'post_save_int_field', {'int_field': [0, 1]}),
+        )
+
+    def test_outbox_event_is_rolled_back_with_the_save(self):
+        instance = TOutboxModel.objects.create()
+
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                instance.int_field = 1
+                instance.save()
+                raise ValueError
+
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_save_and_outbox_event_are_in_a_transaction(self):
+        instance = TOutboxModel.objects.create()
+
+        with mock.patch('event_actions.outbox.records._insert_records', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                # a savepoint for the test's transaction
+                with transaction.atomic():
+                    instance.int_field = 1
+                    instance.save()
+
+        self.assertEqual(TOutboxModel.objects.get(pk=instance.pk).int_field, 0)
+
+    def test_bulk_update_inserts_outbox_events_in_bulk(self):
+        objs = TOutboxModel.objects.bulk_create([TOutboxModel() for _ in range(3)])
+        objs = list(TOutboxModel.objects.all())
+        for obj in objs:
+            obj.int_field = 1
+
+        with mock.patch('event_actions.outbox.records._insert_records') as insert_records:
+            TOutboxModel.objects.bulk_update(objs, ['int_field'])
+
+        insert_records.assert_called_once()
+        self.assertEqual(len(insert_records.call_args[0][0]), 3)
+
+    def test_bulk_create_without_returned_pks_is_rejected(self):
+        with mock.patch.object(TOutboxModel, '_outbox_events', frozenset({constants.POST_CREATE})), \
+                mock.patch.object(connection.features, 'can_return_rows_from_bulk_insert', False):
+            with self.assertRaises(ValueError):
+                TOutboxModel.objects.bulk_create([TOutboxModel() for _ in range(2)])
+
+        self.assertFalse(TOutboxModel.objects.exists())
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_outbox_event_without_pk_is_rejected(self):
+        handler = TOutboxModel._event_handlers[constants.POST_SAVE][0]
+        with self.assertRaises(ValueError):
+            add_outbox_record(TOutboxModel(), handler, {})
+
+    def test_drain_calls_the_handlers(self):
+        instance = TOutboxModel.objects.create()
+        instance.int_field = 1
+        instance.save()
+        pk = instance.pk
+        instance.delete()
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            self.assertEqual(drain_outbox(), 2)
+
+        # the handlers of the deleted objects get an instance with only the primary key
+        self.assertEqual(mocked_function.call_args_list, [
+            mock.call(('post_save_int_field', 0, {'int_field': (0, 1)})),
+            mock.call(('post_delete', pk)),
+        ])
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_drain_retries_the_failed_handlers(self):
+        instance = TOutboxModel.objects.create()
+        instance.int_field = 1
+        instance.save()
+
+        with mock.patch('tests.models.mockable_function', side_effect=ValueError):
+            with self.assertLogs('event_actions.outbox.worker', 'ERROR'):
+                drain_outbox(max_attempts=2, retry_delay=0)
+                drain_outbox(max_attempts=2, retry_delay=0)
+            self.assertEqual(drain_outbox(max_attempts=2, retry_delay=0), 0)
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.attempts, 2)
+        self.assertIn('ValueError', event.last_error)
+
+    def test_failed_handlers_are_retried_with_backoff(self):
+        instance = TOutboxModel.objects.create()
+        instance.int_field = 1
+        instance.save()
+
+        with mock.patch('tests.models.mockable_function', side_effect=ValueError) as mocked_function:
+            with self.assertLogs('event_actions.outbox.worker', 'ERROR'):
+                self.assertEqual(drain_outbox(retry_delay=10), 0)
+            # the event is not retried before its next attempt
+            self.assertEqual(drain_outbox(retry_delay=10), 0)
+            self.assertEqual(mocked_function.call_count, 1)
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.attempts, 1)
+        self.assertGreater(event.next_attempt_at, timezone.now() + timedelta(seconds=5))
+
+        OutboxEvent.objects.update(next_attempt_at=timezone.now())
+        with mock.patch('tests.models.mockable_function', side_effect=ValueError):
+            with self.assertLogs('event_actions.outbox.worker', 'ERROR'):
+                drain_outbox(retry_delay=10)
+
+        # the delay is doubled after each attempt
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.attempts, 2)
+        self.assertGreater(event.next_attempt_at, timezone.now() + timedelta(seconds=15))
+
+    def test_drain_outbox_command(self):
+        instance = TOutboxModel.objects.create()
+        for i in range(1, 4):
+            instance.int_field = i
+            instance.save()
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            call_command('drain_outbox', '--once', '--batch-size=2', stdout=mock.MagicMock())
+
+        self.assertEqual(mocked_function.call_count, 3)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_invalid_outbox_arguments(self):
+        with self.assertRaises(IllegalArgumentError):
+            @PreSaveEvent(outbox=True)
+            def pre_save(self):
+                pass
+
+        with self.assertRaises(IllegalArgumentError):
+            @PostSaveEvent(outbox=True, background=True)
+            def post_save(self):
+                pass
@@ -0,0 +1,80 @@
+import os
+import pstats
+import tempfile
+from unittest import mock
+
+from event_actions import instrumentation, profiling
+from tests.models import TBatchModel, TDiffModel
+from tests.tests.base import TestBase
+
+
+class TestSlowHandlers(TestBase):
+    def tearDown(self):
+        profiling.set_slow_handler_threshold(None)
+
+    def test_slow_handler_is_logged(self):
+        instance = TDiffModel.objects.create(char_field='Foo')
+        profiling.set_slow_handler_threshold(0)
+
+        with self.assertLogs('event_actions.profiling', 'WARNING') as logs:
+            instance.int_field = 1
+            instance.save()
+
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn(f'Slow handler pre_save_int_field of pre_save for tests.TDiffModel(pk={instance.pk})', logs.output[0])
+        self.assertIn('and executed 0 queries', logs.output[0])
+
+    def test_batch_handler_is_logged_with_the_pks(self):
+        profiling.set_slow_handler_threshold(0)
+
+        with self.assertLogs('event_actions.profiling', 'WARNING') as logs:
+            TBatchModel.objects.bulk_create([TBatchModel(pk=1), TBatchModel(pk=2)])
+
+        self.assertIn('pre_create_batch of pre_create for tests.TBatchModel(pk=[1, 2])', logs.output[0])
+
+    def test_fast_handler_is_not_logged(self):
+        instance = TDiffModel.objects.create(char_field='Foo')
+        profiling.set_slow_handler_threshold(1000)
+
+        with mock.patch('event_actions.profiling.logger') as logger:
+            instance.int_field = 1
+            instance.save()
+
+        self.assertFalse(logger.warning.called)
+
+    def test_instrumentation_is_disabled(self):
+        profiling.set_slow_handler_threshold(0)
+        profiling.set_slow_handler_threshold(None)
+        self.assertFalse(instrumentation.enabled)
+
+
+class TestProfiling(TestBase):
+    def tearDown(self):
+        profiling.disable_profiling()
+        profiling.reset_profile_stats()
+
+    def test_sampled_calls_are_profiled(self):
+        instance = TDiffModel.objects.create(char_field='Foo')
+        profiling.enable_profiling(every=2)
+
+        with mock.patch('event_actions.profiling.cProfile.Profile', wraps=profiling.cProfile.Profile) as profile:
+            for i in range(1, 5):
+                instance.int_field = i
+                instance.save()
+
+        # pre_save_int_field is called 4 times
+        self.assertEqual(profile.call_count, 2)
+        self.assertIsInstance(profiling.get_profile_stats(), pstats.Stats)
+
+    def test_dump_profile_stats(self):
+        instance = TDiffModel.objects.create(char_field='Foo')
+        profiling.enable_profiling()
+        instance.int_field = 1
+        instance.save()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'handlers.prof')
+            profiling.dump_profile_stats(path)
+            stats = pstats.Stats(path)
+
+        self.assertTrue(any(func[2] == 'pre_save_int_field' for func in stats.stats))
@@ -0,0 +1,168 @@
+from unittest import mock
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from event_actions.decorators import PreSaveEvent, PostDeleteEvent
+from event_actions.exceptions import IllegalArgumentError
+from event_actions.transactions import _get_scheduled_events
+from tests.models import TModel, TBatchModel, TCommitModel, TCoalesceModel
+from tests.tests.base import TestBase
+
+
+class TestOnCommit(TestBase):
+    def test_post_actions_are_called_on_commit(self):
+        instance = TCommitModel.objects.create()
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                instance.int_field = 1
+                instance.save()
+                instance.int_field = 2
+                self.assertFalse(mocked_function.called)
+
+            self.assertEqual(len(callbacks), 1)
+            # the handler gets the diff of the save
+            mocked_function.assert_called_once_with(('post_save_int_field', {'int_field': (0, 1)}))
+
+    def test_post_actions_are_discarded_on_rollback(self):
+        instance = TCommitModel.objects.create()
+
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                try:
+                    with transaction.atomic():
+                        instance.int_field = 1
+                        instance.save()
+                        raise ValueError()
+                except ValueError:
+                    pass
+
+            self.assertEqual(callbacks, [])
+            self.assertFalse(mocked_function.called)
+
+    def test_decorator_on_commit_argument(self):
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            with self.captureOnCommitCallbacks() as callbacks:
+                TCommitModel.objects.create()
+                mocked_function.assert_called_once_with('post_create')
+                self.assertEqual(callbacks, [])
+
+        instance = TBatchModel.objects.create()
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                instance.delete()
+                self.assertFalse(mocked_function.called)
+
+            self.assertEqual(len(callbacks), 1)
+            mocked_function.assert_called_once_with('post_delete')
+
+    def test_only_post_events_can_be_called_on_commit(self):
+        with self.assertRaises(IllegalArgumentError):
+            PreSaveEvent(on_commit=True)(TModel.normal_function)
+
+
+class TestCoalescing(TestBase):
+    def setUp(self):
+        self.instance = TCoalesceModel.objects.create()
+
+    def save_instance(self, **values):
+        for field_name, value in values.items():
+            setattr(self.instance, field_name, value)
+        self.instance.save()
+
+    def test_saves_are_coalesced(self):
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                self.save_instance(int_field=1)
+                self.save_instance(char_field='Foo')
+                self.save_instance(int_field=2)
+
+            # a callback per save carries its diff to the commit
+            self.assertEqual(len(callbacks), 3)
+            self.assertEqual(
+                [call.args[0] for call in mocked_function.call_args_list],
+                [
+                    'post_save', 'post_save', 'post_save',
+                    ('post_save_int_field', {'char_field': ('', 'Foo'), 'int_field': (0, 2)}),
+                    'post_save_both_fields',
+                ]
+            )
+
+    def test_handlers_are_checked_against_net_diff(self):
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.save_instance(int_field=1)
+                self.save_instance(int_field=0, char_field='Foo')
+
+            self.assert_not_calls(mocked_function, ('post_save_int_field', mock.ANY))
+            self.assert_not_calls(mocked_function, 'post_save_both_fields')
+
+    def test_rolled_back_saves_are_discarded(self):
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        self.save_instance(int_field=1)
+                        raise ValueError()
+                except ValueError:
+                    pass
+
+                self.instance = TCoalesceModel.objects.get(pk=self.instance.pk)
+                self.save_instance(char_field='Foo')
+
+            self.assertEqual(
+                [call.args[0] for call in mocked_function.call_args_list],
+                ['post_save', 'post_save']
+            )
+
+    def test_saves_rolled_back_to_savepoint_are_discarded(self):
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.save_instance(char_field='Foo')
+                try:
+                    with transaction.atomic():
+                        self.save_instance(int_field=5)
+                        raise ValueError()
+                except ValueError:
+                    pass
+
+            self.assert_not_calls(mocked_function, ('post_save_int_field', mock.ANY))
+            self.assert_not_calls(mocked_function, 'post_save_both_fields')
+
+    def test_saves_after_rolled_back_savepoint_are_coalesced(self):
+        with mock.patch('tests.models.mockable_function') as mocked_function:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                self.save_instance(char_field='Foo')
+                try:
+                    with transaction.atomic():
+                        self.save_instance(int_field=5)
+                        raise ValueError()
+                except ValueError:
+                    pass
+                self.save_instance(int_field=2)
+
+            self.assertEqual(len(callbacks), 2)
+            self.assert_calls(mocked_function, ('post_save_int_field', {'char_field': ('', 'Foo'), 'int_field': (5, 2)}))
+            self.assertEqual(
+                [call.args[0] for call in mocked_function.call_args_list].count('post_save_both_fields'), 1
+            )
+
+    def test_rolled_back_events_are_dropped(self):
+        scheduled_events = _get_scheduled_events(DEFAULT_DB_ALIAS)
+        instances = [TCoalesceModel.objects.create() for _ in range(4)]
+
+        with mock.patch('tests.models.mockable_function'):
+            for instance in instances:
+                try:
+                    with transaction.atomic():
+                        instance.int_field = 1
+                        instance.save()
+                        raise ValueError()
+                except ValueError:
+                    pass
+
+        self.assertEqual(len(scheduled_events), 0)
+
+    def test_only_post_save_and_create_can_be_coalesced(self):
+        with self.assertRaises(IllegalArgumentError):
+            PostDeleteEvent(coalesce=True)(TModel.normal_function)